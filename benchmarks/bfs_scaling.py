@@ -0,0 +1,56 @@
+# bfs_scaling.py
+# Measures how BFS running time grows with graph size.
+# A linear-time BFS should show a roughly constant time per node across sizes.
+#
+# Usage: python benchmarks/bfs_scaling.py [max_nodes]
+
+import os
+import sys
+import time
+import random
+
+# Allow running the script directly from the repository root or this directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from methods.bfs_search import bfs
+
+def make_wide_graph(num_nodes, out_degree=4, seed=42):
+    """
+    Builds a random graph whose BFS frontier becomes very wide.
+    Node i links to out_degree random nodes with a larger ID, so every node is reachable from node 1.
+
+    :param num_nodes: Number of nodes in the graph.
+    :param out_degree: Number of outgoing edges per node.
+    :param seed: Random seed, so runs are reproducible.
+    :return: An edges dictionary in the same shape the input parser produces.
+    """
+    rng = random.Random(seed)
+    edges = {}
+    for node in range(1, num_nodes):
+        # Always link to the next node so the whole graph is connected.
+        targets = {node + 1}
+        for _ in range(out_degree - 1):
+            targets.add(rng.randint(node + 1, num_nodes))
+        edges[node] = sorted((dest, 1) for dest in targets)
+    return edges
+
+def main():
+    max_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+
+    sizes = []
+    size = 10 ** 3
+    while size <= max_nodes:
+        sizes.append(size)
+        size *= 10
+
+    print(f"{'nodes':>10} {'generated':>10} {'seconds':>10} {'us/node':>10}")
+    for size in sizes:
+        edges = make_wide_graph(size)
+        # An unreachable destination forces a full traversal of the graph.
+        start = time.perf_counter()
+        _, generated, _ = bfs(1, [-1], edges)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>10} {generated:>10} {elapsed:>10.3f} {elapsed / size * 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# startup.py
+# Measures the command-line startup cost of search.py: the time to run
+# "python search.py <file> <method>" on a tiny input, where interpreter startup
+# and imports dominate, for every method, next to a bare interpreter and a bare
+# "import search". It also counts the repository modules each run imports,
+# which should stay flat as methods are added (see method_registry.py).
+#
+# Usage: python benchmarks/startup.py [--methods BFS,AS,...] [--repeat N] [--input FILE] [--output FILE]
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_INPUT = os.path.join(REPO_ROOT, "test_cases", "test_case1.txt")
+
+def _run_times(command, repeat):
+    """
+    Runs command repeat times and returns the wall time of each run in milliseconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def _repo_modules(command):
+    """
+    Returns the names of the repository modules imported by one run (from python -X importtime).
+    """
+    completed = subprocess.run([command[0], "-X", "importtime"] + command[1:], cwd=REPO_ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    local = {os.path.splitext(name)[0] for name in os.listdir(REPO_ROOT) if name.endswith(".py")}
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        name = line.rsplit("|", 1)[-1].strip()
+        if name.startswith("methods.") or name in local:
+            modules.append(name)
+    return modules
+
+def run_startup_benchmark(methods, input_file=DEFAULT_INPUT, repeat=10):
+    """
+    Times the interpreter alone, "import search" and one search.py run per method.
+
+    :return: A list of result dictionaries with the median, minimum and maximum wall time in ms
+             and the repository modules imported.
+    """
+    python = sys.executable
+    commands = [("python", None, [python, "-c", "pass"]),
+                ("import search", None, [python, "-c", "import search"])]
+    commands += [("search.py", method, [python, "search.py", input_file, method]) for method in methods]
+
+    results = []
+    for name, method, command in commands:
+        times = _run_times(command, repeat)
+        modules = _repo_modules(command)
+        results.append({
+            "command": name,
+            "method": method,
+            "median_ms": statistics.median(times),
+            "min_ms": min(times),
+            "max_ms": max(times),
+            "modules": len(modules),
+            "module_names": modules,
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Time search.py startup for every method.")
+    parser.add_argument("--methods", default="BFS,DFS,GBFS,AS,CUS1,CUS2,IDA,UCS,CH,ALT,BAS",
+                        help="comma-separated method codes (default: all built-in methods)")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per command, median reported (default: 10)")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="input file (default: test_cases/test_case1.txt)")
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    methods = [method.upper() for method in args.methods.split(",")]
+    results = run_startup_benchmark(methods, os.path.abspath(args.input), args.repeat)
+
+    print(f"{'command':>14} {'method':>6} {'median ms':>10} {'min ms':>8} {'max ms':>8} {'modules':>8}")
+    for result in results:
+        print(f"{result['command']:>14} {result['method'] or '-':>6} {result['median_ms']:>10.1f} "
+              f"{result['min_ms']:>8.1f} {result['max_ms']:>8.1f} {result['modules']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "repeat": args.repeat, "results": results}, file, indent=1)
+
+if __name__ == "__main__":
+    main()
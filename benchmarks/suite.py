@@ -0,0 +1,329 @@
+# suite.py
+# Benchmark harness for the search methods on synthetic graphs.
+# Seeded generators build grid, random geometric and scale-free graphs, which are
+# written both in the text input format and as compiled binary graphs. For every
+# graph and format the harness times parsing, graph setup and each search method
+# separately, and writes the results as JSON so runs on different commits can be
+# compared (--compare prints the ratios against an earlier results file).
+#
+# Edge costs are never below the Euclidean distance between their end nodes, so
+# the Euclidean heuristic stays admissible and GBFS/AS/CUS2 behave as on real inputs.
+# Graphs of 10^6 nodes and more need several GB of memory in pure Python.
+#
+# Usage: python benchmarks/suite.py [--sizes 1000,10000] [--kinds grid,geometric,scalefree]
+#                                   [--methods BFS,DFS,GBFS,AS,CUS1,CUS2] [--formats text,binary]
+#                                   [--repeat N] [--seed S] [--output FILE] [--compare FILE]
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+# Allow running the script directly from the repository root or this directory.
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_ROOT)
+
+from graph import Graph
+from input_parser import build_data
+from graph_format import load_graph, write_graph
+from query_engine import run_method
+
+DEFAULT_METHODS = ("BFS", "DFS", "GBFS", "AS", "CUS1", "CUS2")
+
+def _edge_cost(rng, p, q):
+    """
+    Integer cost of an edge between points p and q: at least their distance, with some noise.
+    """
+    return max(1, math.ceil(math.dist(p, q))) + rng.randint(0, 3)
+
+def _pick_query(rng, nodes, num_destinations=3):
+    """
+    Origin 1 and a few random destinations, the last node always among them.
+    """
+    num_nodes = len(nodes)
+    destinations = {num_nodes}
+    while len(destinations) < min(num_destinations, num_nodes):
+        destinations.add(rng.randint(1, num_nodes))
+    return 1, sorted(destinations)
+
+def make_grid_graph(num_nodes, seed=42):
+    """
+    Builds a square grid where every node links to its four neighbors in both directions.
+
+    :param num_nodes: Approximate number of nodes (rounded down to a square).
+    :param seed: Random seed, so runs are reproducible.
+    :return: A tuple (nodes, edges, origin, destinations) as returned by build_data.
+    """
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(num_nodes))
+    nodes = {}
+    edges = {}
+    for row in range(side):
+        for col in range(side):
+            nodes[row * side + col + 1] = (col, row)
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col + 1
+            adjacency = []
+            for d_row, d_col in ((-1, 0), (0, -1), (0, 1), (1, 0)):
+                r, c = row + d_row, col + d_col
+                if 0 <= r < side and 0 <= c < side:
+                    neighbor = r * side + c + 1
+                    adjacency.append((neighbor, _edge_cost(rng, nodes[node], nodes[neighbor])))
+            edges[node] = adjacency
+    origin, destinations = _pick_query(rng, nodes)
+    return nodes, edges, origin, destinations
+
+def make_geometric_graph(num_nodes, seed=42, degree=6):
+    """
+    Builds a random geometric graph: points placed uniformly in a square, each linked
+    (in both directions) to the other points within a radius chosen for the given mean degree.
+
+    :param num_nodes: Number of nodes.
+    :param seed: Random seed, so runs are reproducible.
+    :param degree: Expected number of neighbors per node.
+    :return: A tuple (nodes, edges, origin, destinations) as returned by build_data.
+    """
+    rng = random.Random(seed)
+    size = max(1, int(math.sqrt(num_nodes) * 10))
+    radius = size * math.sqrt(degree / (math.pi * num_nodes))
+    nodes = {node: (rng.randint(0, size), rng.randint(0, size)) for node in range(1, num_nodes + 1)}
+
+    # Bucket the points into radius-sized cells so only nearby cells are compared.
+    cells = {}
+    for node, (x, y) in nodes.items():
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(node)
+
+    edges = {node: [] for node in nodes}
+    for node, (x, y) in nodes.items():
+        cx, cy = int(x // radius), int(y // radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for other in cells.get((cx + dx, cy + dy), ()):
+                    if other > node and math.dist(nodes[node], nodes[other]) <= radius:
+                        cost = _edge_cost(rng, nodes[node], nodes[other])
+                        edges[node].append((other, cost))
+                        edges[other].append((node, cost))
+    for adjacency in edges.values():
+        adjacency.sort()
+    origin, destinations = _pick_query(rng, nodes)
+    return nodes, edges, origin, destinations
+
+def make_scale_free_graph(num_nodes, seed=42, links=2):
+    """
+    Builds a scale-free graph by preferential attachment (Barabasi-Albert): each new node
+    links, in both directions, to `links` existing nodes chosen in proportion to their degree.
+
+    :param num_nodes: Number of nodes.
+    :param seed: Random seed, so runs are reproducible.
+    :param links: Number of links added with every new node.
+    :return: A tuple (nodes, edges, origin, destinations) as returned by build_data.
+    """
+    rng = random.Random(seed)
+    size = max(1, int(math.sqrt(num_nodes) * 10))
+    nodes = {node: (rng.randint(0, size), rng.randint(0, size)) for node in range(1, num_nodes + 1)}
+    edges = {node: [] for node in nodes}
+    # Every node appears once per link end, so a uniform pick is proportional to degree.
+    ends = []
+    for node in range(1, num_nodes + 1):
+        targets = set()
+        while ends and len(targets) < min(links, node - 1):
+            targets.add(rng.choice(ends))
+        if not ends and node > 1:
+            targets.add(node - 1)
+        for other in targets:
+            cost = _edge_cost(rng, nodes[node], nodes[other])
+            edges[node].append((other, cost))
+            edges[other].append((node, cost))
+            ends.extend((node, other))
+    for adjacency in edges.values():
+        adjacency.sort()
+    origin, destinations = _pick_query(rng, nodes)
+    return nodes, edges, origin, destinations
+
+GENERATORS = {
+    "grid": make_grid_graph,
+    "geometric": make_geometric_graph,
+    "scalefree": make_scale_free_graph,
+}
+
+def write_text_graph(filename, nodes, edges, origin, destinations):
+    """
+    Writes a graph in the text input format read by input_parser.
+    """
+    with open(filename, "w") as file:
+        file.write("Nodes:\n")
+        for node, (x, y) in nodes.items():
+            file.write(f"{node}: ({x},{y})\n")
+        file.write("Edges:\n")
+        for source, adjacency in edges.items():
+            for dest, cost in adjacency:
+                file.write(f"({source},{dest}): {cost}\n")
+        file.write(f"Origin:\n{origin}\n")
+        file.write("Destinations:\n" + "; ".join(map(str, destinations)) + "\n")
+
+def _timed(repeat, function, *args):
+    """
+    Runs function repeat times and returns (best seconds, last result).
+    """
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _load(filename, file_format):
+    if file_format == "binary":
+        compiled = load_graph(filename)
+        return compiled.graph, compiled.origin, compiled.destinations
+    nodes, edges, origin, destinations = build_data(filename)
+    return (nodes, edges), origin, destinations
+
+def _build(loaded, file_format):
+    if file_format == "binary":
+        graph = loaded
+        # The loaded graph is reused by every repeat: drop the index the previous one built
+        graph.invalidate_caches()
+    else:
+        graph = Graph(*loaded)
+    graph.reverse_edges  # Backward index used by CUS2, built once per graph
+    return graph
+
+def run_benchmarks(sizes, kinds, methods, formats=("text", "binary"), repeat=1, seed=42, workdir=None, log=None):
+    """
+    Generates every graph, writes it in each format, and times parse, build and search.
+
+    :param sizes: Iterable of node counts.
+    :param kinds: Iterable of generator names (keys of GENERATORS).
+    :param methods: Iterable of method codes (see query_engine.METHODS).
+    :param formats: Iterable of "text" and/or "binary".
+    :param repeat: Number of runs per measurement; the fastest is kept.
+    :param seed: Random seed for the generators.
+    :param workdir: Directory for the generated files (default: a temporary directory, removed afterwards).
+    :param log: Optional stream for progress messages.
+    :return: A list of result dictionaries, one per (graph, format, phase, method).
+    """
+    results = []
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        for kind in kinds:
+            for size in sizes:
+                nodes, edges, origin, destinations = GENERATORS[kind](size, seed)
+                num_edges = sum(len(adjacency) for adjacency in edges.values())
+                base = {"kind": kind, "nodes": len(nodes), "edges": num_edges}
+                files = {}
+                if "text" in formats:
+                    files["text"] = os.path.join(workdir, f"{kind}_{size}.txt")
+                    write_text_graph(files["text"], nodes, edges, origin, destinations)
+                if "binary" in formats:
+                    files["binary"] = os.path.join(workdir, f"{kind}_{size}.graph")
+                    write_graph(files["binary"], nodes, edges, origin, destinations)
+                del nodes, edges
+
+                for file_format, filename in files.items():
+                    if log:
+                        print(f"{kind} {size} {file_format}", file=log, flush=True)
+                    row = dict(base, format=file_format, bytes=os.path.getsize(filename))
+                    seconds, (loaded, origin, destinations) = _timed(repeat, _load, filename, file_format)
+                    results.append(dict(row, phase="parse", method=None, seconds=seconds))
+                    seconds, graph = _timed(repeat, _build, loaded, file_format)
+                    results.append(dict(row, phase="build", method=None, seconds=seconds))
+
+                    for method in methods:
+                        try:
+                            seconds, (goal, count, path) = _timed(
+                                repeat, run_method, method, graph, origin, destinations)
+                            results.append(dict(row, phase="search", method=method, seconds=seconds,
+                                                goal=goal, nodes_generated=count, path_length=len(path)))
+                        except (RecursionError, MemoryError, ValueError) as e:
+                            results.append(dict(row, phase="search", method=method, error=repr(e)))
+                    del loaded, graph
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """
+    Returns a table of time ratios (current / baseline) for the measurements found in both runs.
+    """
+    def key(result):
+        return (result["kind"], result["nodes"], result["format"], result["phase"], result["method"])
+
+    old = {key(result): result for result in baseline["results"] if "seconds" in result}
+    lines = [f"{'kind':>10} {'nodes':>9} {'format':>7} {'phase':>7} {'method':>6} "
+             f"{'before s':>10} {'after s':>10} {'ratio':>7}"]
+    for result in results:
+        before = old.get(key(result))
+        if before is None or "seconds" not in result:
+            continue
+        ratio = result["seconds"] / before["seconds"] if before["seconds"] > 0 else float('inf')
+        lines.append(f"{result['kind']:>10} {result['nodes']:>9} {result['format']:>7} {result['phase']:>7} "
+                     f"{result['method'] or '-':>6} {before['seconds']:>10.4f} {result['seconds']:>10.4f} "
+                     f"{ratio:>7.2f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parsing, graph setup and search on synthetic graphs.")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated node counts, e.g. 1000,10000,100000 (default: 1000,10000)")
+    parser.add_argument("--kinds", default=",".join(GENERATORS),
+                        help="comma-separated graph kinds: " + ", ".join(GENERATORS))
+    parser.add_argument("--methods", default=",".join(DEFAULT_METHODS),
+                        help="comma-separated method codes (default: " + ",".join(DEFAULT_METHODS) + ")")
+    parser.add_argument("--formats", default="text,binary", help="comma-separated: text, binary")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per measurement, fastest kept (default: 1)")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed (default: 42)")
+    parser.add_argument("--workdir", help="keep the generated graph files in this directory")
+    parser.add_argument("--output", help="write the JSON results to this file (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against (table on stderr)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    kinds = args.kinds.split(",")
+    unknown = [kind for kind in kinds if kind not in GENERATORS]
+    if unknown:
+        parser.error("unknown graph kind(s): " + ", ".join(unknown))
+    methods = [method.upper() for method in args.methods.split(",")]
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+
+    results = run_benchmarks(sizes, kinds, methods, args.formats.split(","), args.repeat, args.seed,
+                             args.workdir, log=sys.stderr)
+    report = {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+
+    if args.compare:
+        with open(args.compare) as file:
+            print(compare(results, json.load(file)), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
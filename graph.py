@@ -1,6 +1,200 @@
 # graph.py
 # This module defines the Graph class, which stores the nodes and edges of the graph
 # and provides a method to retrieve neighbors of a given node.
+# It also provides CSRAdjacency, a compact array-backed (compressed sparse row)
+# copy of the edges that the Graph builds once on demand for large networks.
+# The Graph also caches a reverse (incoming-edge) index for backward searches.
+# Nodes, edges and costs can be changed in place (add_node, add_edge, set_edge_cost,
+# ...); the reverse index is kept up to date incrementally, and every change bumps
+# Graph.version so that caches built elsewhere can tell the graph has changed.
+
+from array import array
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+
+# Sort key of (node, cost) adjacency entries
+_first = itemgetter(0)
+
+class CSRAdjacency:
+    """
+    Compressed sparse row (CSR) representation of an adjacency dictionary.
+
+    Every node is given a dense index. The outgoing edges of the node with dense
+    index i are stored at positions offsets[i] .. offsets[i + 1] - 1 of the flat
+    targets and costs arrays, in the same order as the source adjacency lists.
+    Targets are stored as the original node IDs, so callers never need to map
+    them back.
+
+    When node IDs form a contiguous range (the usual case for our input files)
+    the dense index is simply node_id - base and no lookup dictionary is kept.
+
+    The object also behaves like the read-only edges dictionary it was built from
+    (get, [], in, iteration, items), so it can be passed as the edges argument of
+    any search function in methods/.
+    """
+
+    def __init__(self, node_ids, offsets, targets, costs, base=None, index=None):
+        """
+        Wraps already-built CSR arrays. Use from_edges to build them from a dictionary.
+
+        :param node_ids: Sequence of node IDs in dense order.
+        :param offsets: Sequence of len(node_ids) + 1 edge offsets.
+        :param targets: Flat sequence of destination node IDs.
+        :param costs: Flat sequence of edge costs, parallel to targets.
+        :param base: Smallest node ID when the IDs are contiguous, otherwise None.
+        :param index: Dictionary mapping node IDs to dense indexes when base is None.
+        """
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.targets = targets
+        self.costs = costs
+        self.base = base
+        if base is None and index is None:
+            index = {node: i for i, node in enumerate(node_ids)}
+        self.index = index
+
+    @classmethod
+    def from_edges(cls, edges, nodes=None):
+        """
+        Builds the CSR arrays from an adjacency dictionary.
+
+        :param edges: A dictionary mapping source node IDs to lists of (destination, cost) tuples.
+        :param nodes: Optional iterable of node IDs that should be indexed even without edges.
+        :return: A CSRAdjacency instance.
+        """
+        ids = set(edges)
+        if nodes is not None:
+            ids.update(nodes)
+        for adjacency in edges.values():
+            ids.update(dest for dest, _ in adjacency)
+        node_ids = array("q", sorted(ids))
+
+        # Contiguous IDs need no lookup dictionary: index = node_id - base.
+        base = None
+        index = None
+        if node_ids and node_ids[-1] - node_ids[0] == len(node_ids) - 1:
+            base = node_ids[0]
+        else:
+            index = {node: i for i, node in enumerate(node_ids)}
+
+        # Integer costs stay integers so path costs are unchanged.
+        is_integer = all(isinstance(cost, int) for adjacency in edges.values() for _, cost in adjacency)
+
+        offsets = array("q", [0])
+        targets = array("q")
+        costs = array("q" if is_integer else "d")
+        for node in node_ids:
+            for dest, cost in edges.get(node, ()):
+                targets.append(dest)
+                costs.append(cost)
+            offsets.append(len(targets))
+
+        return cls(node_ids, offsets, targets, costs, base=base, index=index)
+
+    def dense_index(self, node):
+        """
+        Returns the dense index of a node, or None if the node is unknown.
+        """
+        if self.base is not None:
+            i = node - self.base
+            return i if 0 <= i < len(self.node_ids) else None
+        return self.index.get(node)
+
+    def edge_range(self, node):
+        """
+        Returns the (start, end) slice of the targets and costs arrays holding the
+        outgoing edges of node. Unknown nodes get an empty range.
+        """
+        # dense_index inlined: this runs once per expanded node in the searches
+        if self.base is not None:
+            i = node - self.base
+            if not 0 <= i < len(self.node_ids):
+                return 0, 0
+        else:
+            i = self.index.get(node)
+            if i is None:
+                return 0, 0
+        offsets = self.offsets
+        return offsets[i], offsets[i + 1]
+
+    def degree(self, node):
+        """
+        Returns the number of outgoing edges of node.
+        """
+        start, end = self.edge_range(node)
+        return end - start
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def nbytes(self):
+        """
+        Returns the approximate memory used by the CSR arrays, in bytes.
+        """
+        total = 0
+        for arr in (self.node_ids, self.offsets, self.targets, self.costs):
+            total += len(arr) * arr.itemsize
+        return total
+
+    # -- Read-only dictionary interface (mirrors the parser's edges dictionary) --
+
+    def get(self, node, default=None):
+        start, end = self.edge_range(node)
+        if start == end:
+            return default
+        return list(zip(self.targets[start:end], self.costs[start:end]))
+
+    def __getitem__(self, node):
+        result = self.get(node)
+        if result is None:
+            raise KeyError(node)
+        return result
+
+    def __contains__(self, node):
+        return self.degree(node) > 0
+
+    def __iter__(self):
+        offsets = self.offsets
+        for i, node in enumerate(self.node_ids):
+            if offsets[i + 1] > offsets[i]:
+                yield node
+
+    def __len__(self):
+        offsets = self.offsets
+        return sum(1 for i in range(len(self.node_ids)) if offsets[i + 1] > offsets[i])
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        for node in self:
+            yield self.get(node)
+
+    def items(self):
+        for node in self:
+            yield node, self.get(node)
+
+def build_reverse_edges(edges):
+    """
+    Builds the incoming-edge index of an adjacency dictionary.
+
+    :param edges: A dictionary mapping source node IDs to lists of (destination, cost) tuples.
+    :return: A dictionary mapping each destination node ID to a list of (source, cost) tuples,
+             sorted by source node (for tie-breaking purposes). Parallel edges keep the
+             order in which they appear in the edges dictionary.
+    """
+    reverse_edges = {}
+    for source, adjacency in edges.items():
+        for dest, cost in adjacency:
+            if dest not in reverse_edges:
+                reverse_edges[dest] = []
+            reverse_edges[dest].append((source, cost))
+
+    for dest in reverse_edges:
+        reverse_edges[dest].sort(key=lambda t: t[0])
+
+    return reverse_edges
 
 class Graph:
     def __init__(self, nodes, edges):
@@ -8,10 +202,179 @@ class Graph:
         Initializes the graph with the provided nodes and edges.
         
         :param nodes: A dictionary mapping node IDs to coordinate tuples (x, y).
-        :param edges: A dictionary mapping source node IDs to a list of tuples (destination, cost).
+        :param edges: A dictionary mapping source node IDs to a list of tuples (destination, cost),
+                      sorted by destination as the input parser produces them.
         """
         self.nodes = nodes  # Store node information.
         self.edges = edges  # Store edge information (connections between nodes).
+        self._csr = None    # Compact adjacency, built on first use.
+        self._reverse_edges = None  # Incoming-edge index, built on first use.
+        self.version = 0    # Incremented by every change to the nodes or edges.
+
+    def invalidate_caches(self):
+        """
+        Drops the derived indexes (CSR adjacency and reverse edges) and bumps the version.
+        Must be called after nodes or edges are changed directly, rather than through the
+        methods below, so they are rebuilt on next use.
+        """
+        self._csr = None
+        self._reverse_edges = None
+        self.version += 1
+
+    # -- In-place changes. Adjacency lists stay sorted by destination (parallel edges keep --
+    # -- their insertion order), the reverse index is updated in place if it was built, and --
+    # -- the CSR copy is patched for cost changes and rebuilt on next use otherwise.         --
+
+    def _make_mutable(self):
+        # A compiled graph reads from a read-only memory map: copy it into dictionaries first
+        if isinstance(self.edges, CSRAdjacency):
+            self.edges = dict(self.edges.items())
+        if not isinstance(self.nodes, dict):
+            self.nodes = dict(self.nodes.items())
+
+    def add_node(self, node, coords):
+        """
+        Adds a node, or moves an existing node to new coordinates.
+
+        :param node: The node ID.
+        :param coords: The (x, y) coordinates.
+        :raises TypeError: If coords is not a pair of coordinates.
+        """
+        coords = tuple(coords) if coords is not None else ()
+        if len(coords) != 2:
+            raise TypeError(f"coordinates of node {node} must be an (x, y) pair, got {coords!r}")
+        self._make_mutable()
+        self.nodes[node] = coords
+        if self._csr is not None and self._csr.dense_index(node) is None:
+            self._csr = None  # The CSR copy indexes every node
+        self.version += 1
+
+    def remove_node(self, node):
+        """
+        Removes a node together with its coordinates and every edge into or out of it.
+
+        :param node: The node ID.
+        :raises KeyError: If the graph has no such node.
+        """
+        self._make_mutable()
+        reverse_edges = self.reverse_edges
+        if node not in self.nodes and node not in self.edges and node not in reverse_edges:
+            raise KeyError(node)
+
+        self.nodes.pop(node, None)
+        for dest, _ in self.edges.pop(node, ()):
+            incoming = reverse_edges.get(dest)
+            if incoming is not None:
+                incoming[:] = [edge for edge in incoming if edge[0] != node]
+                if not incoming:
+                    del reverse_edges[dest]
+        for source in {source for source, _ in reverse_edges.pop(node, ())}:
+            adjacency = self.edges.get(source)
+            if adjacency is not None:
+                adjacency[:] = [edge for edge in adjacency if edge[0] != node]
+                if not adjacency:
+                    del self.edges[source]
+        self._csr = None
+        self.version += 1
+
+    def add_edge(self, source, dest, cost):
+        """
+        Adds an edge. An edge between the same nodes is kept: the new one becomes a parallel edge.
+
+        :param source: The source node ID.
+        :param dest: The destination node ID.
+        :param cost: The edge cost.
+        """
+        self._make_mutable()
+        adjacency = self.edges.setdefault(source, [])
+        adjacency.insert(bisect_right(adjacency, dest, key=_first), (dest, cost))
+        if self._reverse_edges is not None:
+            incoming = self._reverse_edges.setdefault(dest, [])
+            incoming.insert(bisect_right(incoming, source, key=_first), (source, cost))
+        self._csr = None
+        self.version += 1
+
+    def remove_edge(self, source, dest):
+        """
+        Removes the edge from source to dest (and any edges parallel to it).
+
+        :return: The number of edges removed.
+        :raises KeyError: If there is no such edge.
+        """
+        self._make_mutable()
+        adjacency = self.edges.get(source, [])
+        start, end = bisect_left(adjacency, dest, key=_first), bisect_right(adjacency, dest, key=_first)
+        if start == end:
+            raise KeyError((source, dest))
+        del adjacency[start:end]
+        if not adjacency:
+            del self.edges[source]
+        if self._reverse_edges is not None:
+            incoming = self._reverse_edges[dest]
+            del incoming[bisect_left(incoming, source, key=_first):bisect_right(incoming, source, key=_first)]
+            if not incoming:
+                del self._reverse_edges[dest]
+        self._csr = None
+        self.version += 1
+        return end - start
+
+    def set_edge_cost(self, source, dest, cost):
+        """
+        Changes the cost of the edge from source to dest (and of any edges parallel to it) in place.
+
+        :raises KeyError: If there is no such edge.
+        """
+        self._make_mutable()
+        adjacency = self.edges.get(source, [])
+        start, end = bisect_left(adjacency, dest, key=_first), bisect_right(adjacency, dest, key=_first)
+        if start == end:
+            raise KeyError((source, dest))
+        adjacency[start:end] = [(dest, cost)] * (end - start)
+        if self._reverse_edges is not None:
+            incoming = self._reverse_edges[dest]
+            start, end = bisect_left(incoming, source, key=_first), bisect_right(incoming, source, key=_first)
+            incoming[start:end] = [(source, cost)] * (end - start)
+        if self._csr is not None:
+            csr = self._csr
+            start, end = csr.edge_range(source)
+            try:
+                for i in range(start, end):
+                    if csr.targets[i] == dest:
+                        csr.costs[i] = cost
+            except TypeError:
+                # A float cost does not fit the integer cost array: rebuild on next use
+                self._csr = None
+        self.version += 1
+
+    @property
+    def csr(self):
+        """
+        Returns the compact CSR adjacency for this graph, building it on first use.
+        If the graph was created from CSR edges they are returned as they are.
+        """
+        if isinstance(self.edges, CSRAdjacency):
+            return self.edges
+        if self._csr is None:
+            self._csr = CSRAdjacency.from_edges(self.edges, self.nodes)
+        return self._csr
+
+    @property
+    def reverse_edges(self):
+        """
+        Returns the incoming-edge index for this graph, building it on first use.
+        """
+        if self._reverse_edges is None:
+            self._reverse_edges = build_reverse_edges(self.edges)
+        return self._reverse_edges
+
+    def get_predecessors(self, node):
+        """
+        Retrieves the nodes that have an edge into the given node.
+
+        :param node: The node ID whose predecessors are required.
+        :return: A list of tuples (source, cost) sorted by source. Returns an empty list if none exist.
+        """
+        return self.reverse_edges.get(node, [])
 
     def get_neighbors(self, node):
         """
@@ -46,3 +409,4 @@ if __name__ == "__main__":
     print("Origin:", origin)
     print("Destinations:", destinations)
     print("Neighbors of Origin ({}): {}".format(origin, graph_instance.get_neighbors(origin)))
+    print("CSR size: {} edges in {} bytes".format(graph_instance.csr.num_edges, graph_instance.csr.nbytes()))
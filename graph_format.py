@@ -0,0 +1,298 @@
+# graph_format.py
+# This module defines a compiled binary format for graph files and its loader.
+# The text format read by input_parser stays the source of truth: compile_graph
+# imports a text file once and writes the binary file, and load_graph opens the
+# binary file through mmap so that a large graph is usable without parsing and
+# its pages are shared by every process that opens it.
+#
+# Layout (little-endian, every section starts on an 8-byte boundary):
+#   header        magic, version, flags and section sizes (see HEADER)
+#   node_ids      int64[num_nodes], sorted ascending (dense order)
+#   has_coords    uint8[num_nodes], 1 if the node has coordinates
+#   coords        int64 or float64[2 * num_nodes], x and y per node
+#   offsets       int64[num_nodes + 1], CSR offsets into targets/costs
+#   targets       int64[num_edges], destination node IDs
+#   costs         int64 or float64[num_edges]
+#   destinations  int64[num_destinations]
+#   has_names     uint8[num_nodes], 1 if the node has a name (which may be empty)
+#   name_offsets  int64[num_nodes + 1], offsets into the name blob
+#   names         UTF-8 node names taken from the "#" comments of the Nodes section
+#   scenario      UTF-8 scenario description taken from the leading "#" comments
+
+import sys
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from graph import CSRAdjacency, Graph
+from input_parser import parse_file
+
+MAGIC = b"RGRAPH\x00\x00"
+VERSION = 2
+
+# magic, version, flags, num_nodes, num_edges, origin, num_destinations, names_size, scenario_size
+HEADER = struct.Struct("<8sIIqqqqqq")
+
+FLAG_FLOAT_COSTS = 1
+FLAG_FLOAT_COORDS = 2
+FLAG_HAS_ORIGIN = 4
+
+def _padding(size):
+    return -size % 8
+
+def is_binary_graph(filename):
+    """
+    Checks whether a file starts with the compiled graph magic bytes.
+
+    :param filename: The name or path of the file.
+    :return: True if the file is a compiled binary graph.
+    """
+    try:
+        with open(filename, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+class _SortedIndex:
+    """
+    Dense-index lookup over a sorted sequence of node IDs, by binary search.
+    Used instead of a dictionary so that loading needs no per-node Python objects.
+    """
+
+    def __init__(self, node_ids):
+        self.node_ids = node_ids
+
+    def get(self, node, default=None):
+        i = bisect_left(self.node_ids, node)
+        if i < len(self.node_ids) and self.node_ids[i] == node:
+            return i
+        return default
+
+class CoordinateTable(Mapping):
+    """
+    Read-only mapping from node ID to (x, y), backed by the coordinate arrays of a compiled graph.
+    It can be used wherever the parser's nodes dictionary is expected.
+    """
+
+    def __init__(self, csr, has_coords, coords):
+        self.csr = csr
+        self.has_coords = has_coords
+        self.coords = coords
+
+    def __getitem__(self, node):
+        i = self.csr.dense_index(node)
+        if i is None or not self.has_coords[i]:
+            raise KeyError(node)
+        return self.coords[2 * i], self.coords[2 * i + 1]
+
+    def __iter__(self):
+        for i, node in enumerate(self.csr.node_ids):
+            if self.has_coords[i]:
+                yield node
+
+    def __len__(self):
+        return sum(1 for flag in self.has_coords if flag)
+
+class NameTable(Mapping):
+    """
+    Read-only mapping from node ID to its name, backed by one UTF-8 blob.
+    Names are only decoded when they are looked up.
+    """
+
+    def __init__(self, csr, has_names, name_offsets, names):
+        self.csr = csr
+        self.has_names = has_names
+        self.name_offsets = name_offsets
+        self.names = names
+
+    def __getitem__(self, node):
+        i = self.csr.dense_index(node)
+        if i is None or not self.has_names[i]:
+            raise KeyError(node)
+        return bytes(self.names[self.name_offsets[i]:self.name_offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for i, node in enumerate(self.csr.node_ids):
+            if self.has_names[i]:
+                yield node
+
+    def __len__(self):
+        return sum(1 for flag in self.has_names if flag)
+
+class CompiledGraph:
+    """
+    A graph problem loaded from a compiled binary file.
+
+    Attributes:
+        graph: A Graph whose edges are a CSRAdjacency and whose nodes are a CoordinateTable,
+               both reading straight from the memory-mapped file.
+        origin: The origin node stored in the file, or None.
+        destinations: The list of destination nodes stored in the file.
+        node_names: A NameTable of node names.
+        scenario: The scenario description, or "".
+    """
+
+    def __init__(self, graph, origin, destinations, node_names, scenario):
+        self.graph = graph
+        self.origin = origin
+        self.destinations = destinations
+        self.node_names = node_names
+        self.scenario = scenario
+
+def _write_array(file, values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    data = values.tobytes()
+    file.write(data)
+    file.write(b"\0" * _padding(len(data)))
+
+def _write_bytes(file, data):
+    file.write(data)
+    file.write(b"\0" * _padding(len(data)))
+
+def write_graph(filename, nodes, edges, origin=None, destinations=(), node_names=None, scenario=""):
+    """
+    Writes a graph to a compiled binary file.
+
+    :param filename: The output file name.
+    :param nodes: A dictionary mapping node IDs to (x, y) coordinates.
+    :param edges: A dictionary mapping source node IDs to lists of (destination, cost) tuples.
+    :param origin: The origin node, or None.
+    :param destinations: A list of destination node IDs.
+    :param node_names: Optional dictionary mapping node IDs to names.
+    :param scenario: Optional scenario description.
+    :return: The CSRAdjacency that was written.
+    """
+    csr = CSRAdjacency.from_edges(edges, nodes)
+    node_names = node_names or {}
+
+    float_coords = any(not isinstance(v, int) for xy in nodes.values() for v in xy)
+    has_coords = array("B")
+    coords = array("d" if float_coords else "q")
+    has_names = array("B")
+    name_offsets = array("q", [0])
+    names = bytearray()
+    for node in csr.node_ids:
+        xy = nodes.get(node)
+        has_coords.append(1 if xy is not None else 0)
+        coords.extend(xy if xy is not None else (0, 0))
+        has_names.append(1 if node in node_names else 0)
+        if node in node_names:
+            names += node_names[node].encode("utf-8")
+        name_offsets.append(len(names))
+
+    scenario_bytes = scenario.encode("utf-8")
+    flags = 0
+    if csr.costs.typecode == "d":
+        flags |= FLAG_FLOAT_COSTS
+    if float_coords:
+        flags |= FLAG_FLOAT_COORDS
+    if origin is not None:
+        flags |= FLAG_HAS_ORIGIN
+
+    with open(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, len(csr.node_ids), csr.num_edges,
+                               origin if origin is not None else 0, len(destinations),
+                               len(names), len(scenario_bytes)))
+        _write_array(file, csr.node_ids)
+        _write_bytes(file, has_coords.tobytes())
+        _write_array(file, coords)
+        _write_array(file, csr.offsets)
+        _write_array(file, csr.targets)
+        _write_array(file, csr.costs)
+        _write_array(file, array("q", destinations))
+        _write_bytes(file, has_names.tobytes())
+        _write_array(file, name_offsets)
+        _write_bytes(file, bytes(names))
+        _write_bytes(file, scenario_bytes)
+    return csr
+
+def compile_graph(source_filename, output_filename):
+    """
+    Imports a text input file and writes it as a compiled binary graph,
+    including the node names and scenario description found in its comments.
+
+    :param source_filename: The text input file.
+    :param output_filename: The binary file to write.
+    :return: A tuple (num_nodes, num_edges) of the written graph.
+    """
+    parsed = parse_file(source_filename)
+    csr = write_graph(output_filename, parsed.nodes, parsed.edges, parsed.origin, parsed.destinations,
+                      parsed.node_names, parsed.scenario)
+    return len(csr.node_ids), csr.num_edges
+
+def load_graph(filename):
+    """
+    Opens a compiled binary graph through a read-only memory map.
+    No data is copied: the arrays of the returned graph are views into the mapping.
+
+    :param filename: The binary graph file.
+    :return: A CompiledGraph.
+    :raises ValueError: If the file is not a compiled graph of a supported version, or is truncated.
+    """
+    with open(filename, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    if len(view) < HEADER.size:
+        raise ValueError(f"{filename} is not a compiled graph file")
+    magic, version, flags, num_nodes, num_edges, origin, num_destinations, names_size, scenario_size = \
+        HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{filename} is not a compiled graph file")
+    if version != VERSION:
+        raise ValueError(f"{filename} has unsupported graph format version {version}; "
+                         f"compile it again with \"search.py compile\"")
+
+    # Sizes of the sections in file order, checked against the file before any of them is read
+    sizes = [8 * num_nodes, num_nodes, 16 * num_nodes, 8 * (num_nodes + 1), 8 * num_edges, 8 * num_edges,
+             8 * num_destinations, num_nodes, 8 * (num_nodes + 1), names_size, scenario_size]
+    expected = HEADER.size + sum(size + _padding(size) for size in sizes)
+    if min(num_nodes, num_edges, num_destinations, names_size, scenario_size) < 0 or len(view) < expected:
+        raise ValueError(f"{filename} is truncated or corrupt: the header describes {expected} bytes, "
+                         f"the file has {len(view)}")
+
+    position = HEADER.size
+
+    def section(size, typecode=None):
+        nonlocal position
+        data = view[position:position + size]
+        position += size + _padding(size)
+        if typecode is None:
+            return data
+        if sys.byteorder != "little":
+            # Big-endian hosts need a byte-swapped copy.
+            values = array(typecode, data.tobytes())
+            values.byteswap()
+            return values
+        return data.cast(typecode)
+
+    coord_type = "d" if flags & FLAG_FLOAT_COORDS else "q"
+    cost_type = "d" if flags & FLAG_FLOAT_COSTS else "q"
+
+    node_ids = section(8 * num_nodes, "q")
+    has_coords = section(num_nodes, "B")
+    coords = section(16 * num_nodes, coord_type)
+    offsets = section(8 * (num_nodes + 1), "q")
+    targets = section(8 * num_edges, "q")
+    costs = section(8 * num_edges, cost_type)
+    destinations = list(section(8 * num_destinations, "q"))
+    has_names = section(num_nodes, "B")
+    name_offsets = section(8 * (num_nodes + 1), "q")
+    names = section(names_size)
+    scenario = bytes(section(scenario_size)).decode("utf-8")
+
+    # Node IDs are stored sorted; contiguous IDs need no index at all.
+    if num_nodes and node_ids[num_nodes - 1] - node_ids[0] == num_nodes - 1:
+        csr = CSRAdjacency(node_ids, offsets, targets, costs, base=node_ids[0])
+    else:
+        csr = CSRAdjacency(node_ids, offsets, targets, costs, index=_SortedIndex(node_ids))
+
+    graph = Graph(CoordinateTable(csr, has_coords, coords), csr)
+    return CompiledGraph(graph,
+                         origin if flags & FLAG_HAS_ORIGIN else None,
+                         destinations,
+                         NameTable(csr, has_names, name_offsets, names),
+                         scenario)
@@ -2,6 +2,17 @@
 # This module reads an input file (here called "input_data.txt") containing the graph data.
 # It splits the file into meaningful sections (Nodes, Edges, Origin, Destinations)
 # and then parses each section into Python data structures that our program can use.
+# build_data uses a single-pass streaming parser (parse_stream) that builds the
+# node and edge structures directly while the file is read, line by line.
+# parse_file returns everything search.py needs from the same pass, including the
+# scenario description and the node names found in comments (a ParsedInput).
+
+import os
+import sys
+import mmap
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
 
 def read_file(filename):
     """
@@ -35,6 +46,56 @@ def split_sections(lines):
             sections[current_key].append(line)
     return sections
 
+def parse_node_line(line):
+    """
+    Parses one line of the "Nodes:" section, e.g. "1: (4,1)    # Optional name".
+    
+    :param line: A stripped line from the "Nodes:" section.
+    :return: A tuple (node_id, (x, y)), or None if the line is not a node definition.
+    """
+    # Split by the first colon to separate node_id from the rest
+    node_id_str, colon, coord_str = line.partition(":")
+    if not colon:
+        return None
+        
+    node_id = int(node_id_str)              # Convert the node ID to an integer.
+    
+    # Remove comments if present by cutting at the first '#'
+    hash_index = coord_str.find('#')
+    if hash_index >= 0:
+        coord_str = coord_str[:hash_index]
+        
+    coord_parts = coord_str.strip().strip("()").split(",", 2)  # Split the coordinate string.
+    if len(coord_parts) < 2:
+        return None
+        
+    # int() ignores surrounding whitespace, so the parts need no extra stripping.
+    return node_id, (int(coord_parts[0]), int(coord_parts[1]))
+
+def parse_named_node_line(line):
+    """
+    Parses one line of the "Nodes:" section like parse_node_line, and also returns the
+    name given in its comment, e.g. "1: (0,0)    # Downtown Central Station".
+    
+    :param line: A stripped line from the "Nodes:" section.
+    :return: A tuple (node_id, (x, y) or None, name or None), or None if the line has no colon.
+    """
+    node_id_str, colon, coord_str = line.partition(":")
+    if not colon:
+        return None
+        
+    node_id = int(node_id_str)
+    name = None
+    hash_index = coord_str.find('#')
+    if hash_index >= 0:
+        name = coord_str[hash_index + 1:].strip()
+        coord_str = coord_str[:hash_index]
+        
+    coord_parts = coord_str.strip().strip("()").split(",", 2)
+    if len(coord_parts) < 2:
+        return node_id, None, name
+    return node_id, (int(coord_parts[0]), int(coord_parts[1])), name
+
 def parse_nodes(node_lines):
     """
     Parses the "Nodes:" section. Each line is expected in the format:
@@ -46,26 +107,48 @@ def parse_nodes(node_lines):
     """
     nodes = {}
     for line in node_lines:
-        # Split by the first colon to separate node_id from the rest
-        parts = line.split(":", 1)
-        if len(parts) < 2:
-            continue
-            
-        node_id_str, coord_str = parts
-        node_id = int(node_id_str.strip())      # Convert the node ID to an integer.
+        parsed = parse_node_line(line)
+        if parsed is not None:
+            node_id, coords = parsed
+            nodes[node_id] = coords   # Store the node with its coordinates.
+    
+    return nodes
+
+def parse_edge_line(line):
+    """
+    Parses one line of the "Edges:" section, e.g. "(2,1): 4    # Optional comment".
+    
+    :param line: A stripped line from the "Edges:" section.
+    :return: A tuple (from_node, to_node, cost), or None if the line is not an edge definition.
+    """
+    # Split by the first colon to separate edge_part from cost
+    edge_part, colon, cost_str = line.partition(":")
+    if not colon:
+        return None
         
-        # Remove comments if present by splitting on '#' and taking first part
-        if '#' in coord_str:
-            coord_str = coord_str.split('#')[0]
-            
-        coord_str = coord_str.strip().strip("()")  # Remove spaces and parentheses.
-        coord_parts = coord_str.split(",")        # Split the coordinate string.
+    # Remove comments if present by cutting at the first '#'
+    hash_index = cost_str.find('#')
+    if hash_index >= 0:
+        cost_str = cost_str[:hash_index]
+        
+    cost = int(cost_str)                    # Convert the cost to an integer.
+    edge_parts = edge_part.strip().strip("()").split(",", 2)
+    if len(edge_parts) < 2:
+        return None
         
-        if len(coord_parts) >= 2:
-            x_str, y_str = coord_parts[0].strip(), coord_parts[1].strip()
-            nodes[node_id] = (int(x_str), int(y_str))   # Store the node with its coordinates.
+    return int(edge_parts[0]), int(edge_parts[1]), cost
+
+def sort_edges(edges):
+    """
+    Sorts every adjacency list in place by destination node (for tie-breaking purposes).
+    The sort is stable, so parallel edges keep their input order.
     
-    return nodes
+    :param edges: A dictionary mapping source nodes to lists of (destination, cost) tuples.
+    :return: The same dictionary.
+    """
+    for adjacency in edges.values():
+        adjacency.sort(key=lambda t: t[0])
+    return edges
 
 def parse_edges(edge_lines):
     """
@@ -80,37 +163,20 @@ def parse_edges(edge_lines):
     """
     edges = {}
     for line in edge_lines:
-        # Split by the first colon to separate edge_part from cost
-        parts = line.split(":", 1)
-        if len(parts) < 2:
+        parsed = parse_edge_line(line)
+        if parsed is None:
             continue
             
-        edge_part, cost_str = parts
-        
-        # Remove comments if present by splitting on '#' and taking first part
-        if '#' in cost_str:
-            cost_str = cost_str.split('#')[0]
+        from_node, to_node, cost = parsed
+        # If this source node hasn't been seen before, add it with an empty list.
+        if from_node not in edges:
+            edges[from_node] = []
             
-        cost = int(cost_str.strip())           # Convert the cost to an integer.
-        edge_part = edge_part.strip().strip("()")  # Remove extra spaces and parentheses.
-        
-        edge_parts = edge_part.split(",")
-        if len(edge_parts) >= 2:
-            from_str, to_str = edge_parts[0].strip(), edge_parts[1].strip()
-            from_node, to_node = int(from_str), int(to_str)
-            
-            # If this source node hasn't been seen before, add it with an empty list.
-            if from_node not in edges:
-                edges[from_node] = []
-                
-            # Append the (destination, cost) tuple to the source node's list.
-            edges[from_node].append((to_node, cost))
+        # Append the (destination, cost) tuple to the source node's list.
+        edges[from_node].append((to_node, cost))
             
     # Sort the list of edges for each node by destination node for consistent tie-breaking.
-    for from_node in edges:
-        edges[from_node] = sorted(edges[from_node], key=lambda t: t[0])
-        
-    return edges
+    return sort_edges(edges)
 
 def parse_origin(origin_lines):
     """
@@ -148,24 +214,285 @@ def parse_destinations(dest_lines):
         
     return [int(item.strip()) for item in dest_str.split(";")]
 
-def build_data(filename):
+def iter_mmap_lines(file):
+    """
+    Yields the lines of an open binary file through a read-only memory map,
+    so the operating system pages the file in instead of Python buffering it.
+    
+    :param file: A file object opened in binary mode.
+    """
+    # Empty files cannot be memory mapped, and have no lines anyway.
+    if os.fstat(file.fileno()).st_size == 0:
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for line in iter(mapped.readline, b""):
+            yield line.decode("utf-8")
+
+class NodeNameTable(Mapping):
+    """
+    Compact read-only mapping from node ID to the name given in its "#" comment.
+    
+    Every distinct name is stored once, as an interned string, and each named node
+    keeps only an index into that list; node IDs and indexes live in two flat arrays
+    searched by bisection, so no per-node dictionary entry or string copy is made.
+    """
+    
+    def __init__(self):
+        self.node_ids = array("q")
+        self.name_ids = array("q")
+        self.names = []
+        self._name_index = {}
+        self._sorted = True
+    
+    def add(self, node, name):
+        """
+        Records the name of a node; a later name for the same node replaces the earlier one.
+        """
+        self.extend((node,), (name,))
+    
+    def extend(self, nodes, names):
+        """
+        Records the names of several nodes (parallel sequences of node IDs and names).
+        """
+        name_index = self._name_index
+        all_names = self.names
+        name_ids = []
+        for name in names:
+            i = name_index.get(name)
+            if i is None:
+                i = name_index[name] = len(all_names)
+                all_names.append(sys.intern(name))
+            name_ids.append(i)
+        node_ids = array("q", nodes)
+        if self._sorted:
+            # Still sorted if the new IDs keep ascending from the last one recorded
+            ordered = self.node_ids[-1:] + node_ids
+            self._sorted = all(a < b for a, b in zip(ordered, ordered[1:]))
+        self.node_ids.extend(node_ids)
+        self.name_ids.extend(name_ids)
+    
+    def _sort(self):
+        # Input files usually list nodes in order, so this rarely has work to do
+        pairs = {}
+        for node, i in zip(self.node_ids, self.name_ids):
+            pairs[node] = i
+        self.node_ids = array("q", sorted(pairs))
+        self.name_ids = array("q", (pairs[node] for node in self.node_ids))
+        self._sorted = True
+    
+    def __getitem__(self, node):
+        if not self._sorted:
+            self._sort()
+        i = bisect_left(self.node_ids, node)
+        if i < len(self.node_ids) and self.node_ids[i] == node:
+            return self.names[self.name_ids[i]]
+        raise KeyError(node)
+    
+    def __iter__(self):
+        if not self._sorted:
+            self._sort()
+        return iter(self.node_ids)
+    
+    def __len__(self):
+        if not self._sorted:
+            self._sort()
+        return len(self.node_ids)
+
+class ParsedInput:
+    """
+    Everything read from an input file in one pass (see parse_file).
+    
+    Attributes:
+        nodes: A dictionary mapping node IDs to (x, y) coordinates.
+        edges: A dictionary mapping source node IDs to sorted lists of (destination, cost) tuples.
+        origin: The origin node, or None.
+        destinations: A list of destination nodes.
+        scenario: The scenario description from the "#" lines before the Nodes section, or "".
+        node_names: A NodeNameTable of the names in the Nodes section comments
+                    (empty unless the file was parsed with names).
+    """
+    
+    def __init__(self, nodes, edges, origin, destinations, scenario="", node_names=None):
+        self.nodes = nodes
+        self.edges = edges
+        self.origin = origin
+        self.destinations = destinations
+        self.scenario = scenario
+        self.node_names = node_names if node_names is not None else NodeNameTable()
+
+def parse_stream(lines):
+    """
+    Parses an input file in a single pass over its lines.
+    
+    Section headers, comments and malformed lines are handled exactly as by
+    split_sections and the parse_* functions, but each line is parsed as soon as
+    it is read, so no list of lines or per-section copies are kept in memory.
+    
+    :param lines: An iterable of lines (for example an open file).
+    :return: A tuple (nodes, edges, origin, destinations), as returned by build_data.
+    """
+    parsed = parse_input(lines, with_names=False)
+    return parsed.nodes, parsed.edges, parsed.origin, parsed.destinations
+
+def parse_input(lines, with_names=True):
+    """
+    Parses an input file in a single pass over its lines, like parse_stream, and also
+    collects the scenario description (as get_scenario_description) and, with with_names,
+    the node names (as extract_node_names) from the same pass.
+    
+    :param lines: An iterable of lines (for example an open file).
+    :param with_names: Whether to collect the node names.
+    :return: A ParsedInput.
     """
-    Combines the steps to read the file, split it into sections, and parse each section.
+    nodes = {}
+    edges = {}
+    origin_line = None
+    destination_line = None
+    current_key = None
+    scenario = []
+    seen_nodes = False
+    # Named nodes and their names, turned into a NodeNameTable at the end
+    name_nodes = []
+    name_texts = []
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        # Comment lines before the Nodes section describe the scenario
+        if not seen_nodes and line[0] == '#':
+            scenario.append(line[1:].strip())
+            
+        # When a line ends with ":", it denotes a new section header.
+        # A repeated header starts that section over, as split_sections does.
+        if line.endswith(":"):
+            current_key = line.rstrip(":")
+            if current_key == "Nodes":
+                nodes = {}
+                seen_nodes = True
+                name_nodes = []
+                name_texts = []
+            elif current_key == "Edges":
+                edges = {}
+            elif current_key == "Origin":
+                origin_line = None
+            elif current_key == "Destinations":
+                destination_line = None
+            continue
+            
+        if current_key == "Edges":
+            parsed = parse_edge_line(line)
+            if parsed is not None:
+                from_node, to_node, cost = parsed
+                adjacency = edges.get(from_node)
+                if adjacency is None:
+                    adjacency = edges[from_node] = []
+                adjacency.append((to_node, cost))
+        elif current_key == "Nodes":
+            if with_names:
+                parsed = parse_named_node_line(line)
+                if parsed is not None:
+                    node_id, coords, name = parsed
+                    if coords is not None:
+                        nodes[node_id] = coords
+                    if name is not None:
+                        name_nodes.append(node_id)
+                        name_texts.append(name)
+            else:
+                parsed = parse_node_line(line)
+                if parsed is not None:
+                    nodes[parsed[0]] = parsed[1]
+        elif current_key == "Origin":
+            # Only the first line of the section is used.
+            if origin_line is None:
+                origin_line = line
+        elif current_key == "Destinations":
+            if destination_line is None:
+                destination_line = line
+    
+    origin = parse_origin([origin_line] if origin_line is not None else [])
+    destinations = parse_destinations([destination_line] if destination_line is not None else [])
+    node_names = NodeNameTable()
+    node_names.extend(name_nodes, name_texts)
+    return ParsedInput(nodes, sort_edges(edges), origin, destinations, "\n".join(scenario), node_names)
+
+def build_data(filename, use_mmap=False):
+    """
+    Reads the file and parses each section in a single streaming pass.
     
     :param filename: The name or path of the input file.
+    :param use_mmap: If True, read the file through a memory map instead of buffered reads.
     :return: A tuple (nodes, edges, origin, destinations) containing:
              - nodes: a dictionary of node coordinates,
              - edges: a dictionary of edges,
              - origin: the starting node,
              - destinations: a list of destination nodes.
     """
-    lines = read_file(filename)
-    sections = split_sections(lines)
-    nodes = parse_nodes(sections.get("Nodes", []))
-    edges = parse_edges(sections.get("Edges", []))
-    origin = parse_origin(sections.get("Origin", []))
-    destinations = parse_destinations(sections.get("Destinations", []))
-    return nodes, edges, origin, destinations
+    if use_mmap:
+        with open(filename, "rb") as file:
+            return parse_stream(iter_mmap_lines(file))
+    with open(filename, "r") as file:
+        return parse_stream(file)
+
+def parse_file(filename, with_names=True, use_mmap=False):
+    """
+    Reads an input file once and returns its graph, query, scenario and node names.
+    Same results as build_data, get_scenario_description and extract_node_names together,
+    without reading the file three times.
+    
+    :param filename: The name or path of the input file.
+    :param with_names: Whether to collect the node names (only needed for human-readable output).
+    :param use_mmap: If True, read the file through a memory map instead of buffered reads.
+    :return: A ParsedInput.
+    """
+    if use_mmap:
+        with open(filename, "rb") as file:
+            return parse_input(iter_mmap_lines(file), with_names)
+    with open(filename, "r") as file:
+        return parse_input(file, with_names)
+
+def get_scenario_description(filename):
+    """Extract scenario description from a file if it exists (lines starting with #)"""
+    scenario = []
+    try:
+        with open(filename, 'r') as f:
+            for line in f:
+                if line.strip().startswith('#'):
+                    scenario.append(line.strip()[1:].strip())
+                elif line.strip().startswith('Nodes:'):
+                    break
+    except:
+        return ""
+    
+    return "\n".join(scenario) if scenario else ""
+
+def extract_node_names(filename):
+    """Extract node names from comments in the node definitions"""
+    node_names = {}
+    try:
+        in_nodes_section = False
+        with open(filename, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('Nodes:'):
+                    in_nodes_section = True
+                    continue
+                elif line.startswith('Edges:'):
+                    in_nodes_section = False
+                    break
+                
+                if in_nodes_section and ':' in line and '#' in line:
+                    # Extract node ID and name from lines like "1: (0,0)    # Downtown Central Station"
+                    parts = line.split(':', 1)
+                    node_id = parts[0].strip()
+                    comment_parts = parts[1].split('#', 1)
+                    if len(comment_parts) > 1:
+                        node_name = comment_parts[1].strip()
+                        node_names[int(node_id)] = node_name
+    except Exception as e:
+        print(f"# Note: Couldn't extract node names: {str(e)}")
+    
+    return node_names
 
 # When you run this module by itself, it will load and print the data from the input file.
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+# method_registry.py
+# This module maps method codes to the functions that implement them without
+# importing any search module up front. Each method is named by a
+# "module:function" string and imported the first time it is run, so starting
+# the CLI costs the same however many methods exist, and a run only pays for
+# the modules it uses.
+#
+# Extra methods can be added without editing this file, either by calling
+# register or by installing a package that declares an entry point in the
+# "route_search.methods" group, e.g. in its pyproject.toml:
+#     [project.entry-points."route_search.methods"]
+#     JPS = "my_package.jps:jps"
+# Plugin functions are called as function(origin, destinations, edges, node_positions,
+# stats=stats) and must return (goal_reached, nodes_generated, path) like the built-ins.
+
+import importlib
+
+ENTRY_POINT_GROUP = "route_search.methods"
+
+BUILTIN_METHODS = {
+    "BFS": "methods.bfs_search:bfs",
+    "DFS": "methods.dfs_search:dfs",
+    "GBFS": "methods.gbfs_search:gbfs",
+    "AS": "methods.astar_search:astar",
+    "CUS1": "methods.iddfs_search:iddfs",
+    "CUS2": "methods.bdwa_search:bdwa",
+    "IDA": "methods.idastar_search:idastar",
+    "UCS": "methods.ucs_search:ucs",
+    "CH": "methods.ch_search:ch",
+    "ALT": "methods.astar_search:astar",
+    "BAS": "methods.bastar_search:bastar",
+}
+
+def load_object(target):
+    """
+    Imports a "module:attribute" target and returns the attribute.
+
+    :raises ImportError: If the module cannot be imported.
+    :raises AttributeError: If the module has no such attribute.
+    """
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+class MethodRegistry:
+    """
+    Method codes and the lazily imported functions behind them.
+    Plugin entry points are only looked up when a code is not built in, or when
+    the full list of codes is asked for.
+    """
+
+    def __init__(self, methods=None, load_plugins=True):
+        """
+        :param methods: Dictionary mapping codes to "module:function" targets (default: BUILTIN_METHODS).
+        :param load_plugins: Whether to look for methods declared by installed entry points.
+        """
+        self.targets = dict(BUILTIN_METHODS if methods is None else methods)
+        self.functions = {}
+        self.plugins_loaded = not load_plugins
+
+    def register(self, code, target):
+        """
+        Adds or replaces a method.
+
+        :param code: The method code (case-insensitive).
+        :param target: A "module:function" string, imported on first use, or the function itself.
+        """
+        code = code.upper()
+        self.functions.pop(code, None)
+        if callable(target):
+            self.functions[code] = target
+        self.targets[code] = target
+
+    def _load_plugins(self):
+        # Entry points never replace a built-in or an explicitly registered method
+        self.plugins_loaded = True
+        # Imported here: importlib.metadata is slow to import and most runs never need it
+        from importlib.metadata import entry_points
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            self.targets.setdefault(entry_point.name.upper(), entry_point.value)
+
+    def codes(self):
+        """
+        Returns every known method code: the built-ins first, then registered and plugin methods.
+        """
+        if not self.plugins_loaded:
+            self._load_plugins()
+        return tuple(self.targets)
+
+    def __contains__(self, code):
+        code = code.upper()
+        if code not in self.targets and not self.plugins_loaded:
+            self._load_plugins()
+        return code in self.targets
+
+    def is_builtin(self, code):
+        """
+        Returns True if code runs the built-in implementation (with its own calling convention).
+        """
+        code = code.upper()
+        return code in BUILTIN_METHODS and self.targets.get(code) == BUILTIN_METHODS[code]
+
+    def resolve(self, code):
+        """
+        Returns the function implementing a method, importing its module on first use.
+
+        :raises ValueError: If the method code is unknown.
+        """
+        code = code.upper()
+        function = self.functions.get(code)
+        if function is not None:
+            return function
+        if code not in self:
+            raise ValueError(f"Unknown method '{code}'")
+        function = load_object(self.targets[code])
+        self.functions[code] = function
+        return function
+
+# The registry used by query_engine, search.py and the servers.
+registry = MethodRegistry()
@@ -1,34 +1,9 @@
 import sys
-import math
-from queue import PriorityQueue
-from graph import Graph
+from graph import Graph, CSRAdjacency
 from input_parser import build_data
-
-def calculate_heuristic(current_node, goal_nodes, node_positions):
-    """
-    Calculate the heuristic value (Euclidean distance) to the closest goal.
-    
-    Args:
-        current_node: The node for which to calculate the heuristic
-        goal_nodes: List of destination node IDs
-        node_positions: Dictionary mapping node IDs to their (x,y) coordinates
-        
-    Returns:
-        float: The minimum Euclidean distance to any goal node
-    """
-    if not goal_nodes:
-        return float('inf')
-        
-    # Find the minimum Euclidean distance to any goal
-    min_distance = float('inf')
-    for goal in goal_nodes:
-        if goal in node_positions and current_node in node_positions:
-            x1, y1 = node_positions[current_node]
-            x2, y2 = node_positions[goal]
-            distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            min_distance = min(min_distance, distance)
-    
-    return min_distance
+from methods.heuristic import EuclideanHeuristic
+from methods.search_state import reconstruct_path
+from methods.frontier import PriorityFrontier
 
 def get_path_cost(path, edges):
     """
@@ -54,7 +29,7 @@ def get_path_cost(path, edges):
                 
     return total_cost
 
-def astar(origin, destinations, edges, node_positions):
+def astar(origin, destinations, edges, node_positions, heuristic=None, stats=None):
     """
     A* Search implementation.
     - Uses both the cost to reach the goal from the current node (heuristic)
@@ -66,6 +41,10 @@ def astar(origin, destinations, edges, node_positions):
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
         node_positions: Dictionary mapping node IDs to (x,y) coordinates
+        heuristic: Optional callable returning a lower bound on the cost from a node
+                   to the closest destination (e.g. a LandmarkHeuristic). Defaults to
+                   the Euclidean distance over node_positions.
+        stats: Optional SearchStats that records expansions, frontier activity and heuristic calls
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -74,33 +53,46 @@ def astar(origin, destinations, edges, node_positions):
             - path: List of node IDs representing the path from origin to goal
     """
     # Initialize data structures
-    open_set = PriorityQueue()
-    open_set.put((0, 0, origin, [origin]))  # (f_score, g_score, node, path)
+    # Ties on f_score are broken by node ID, then by insertion order
+    open_set = PriorityFrontier(stats)
+    open_set.push(origin, 0, None)  # node, f_score, parent
     closed_set = set()
+    came_from = {}
     nodes_generated = 0
     
     # Keep track of the g_score (cost from start to node)
     g_scores = {origin: 0}
     
-    # For breaking ties (chronological order)
-    entry_count = 0
+    # Compiled graphs keep their edges in CSR arrays, read directly without building tuples
+    csr = edges if isinstance(edges, CSRAdjacency) else None
+    
+    # Distance to the closest goal, indexed and memoized for this search
+    if heuristic is None:
+        heuristic = EuclideanHeuristic(destinations, node_positions, stats=stats)
     
-    while not open_set.empty():
+    while open_set:
         # Get node with lowest f_score
-        f_score, g_score, current, path = open_set.get()
+        current, f_score, parent = open_set.pop()
+        g_score = g_scores[current]
         
-        if current in closed_set:
-            continue
-            
         closed_set.add(current)
+        if parent is not None:
+            came_from[current] = parent
         nodes_generated += 1
+        if stats is not None:
+            stats.expand()
         
         # Check if we've reached a destination
         if current in destinations:
-            return current, nodes_generated, path
+            return current, nodes_generated, reconstruct_path(came_from, current)
         
         # Explore neighbors
-        for neighbor, edge_cost in edges.get(current, []):
+        if csr is not None:
+            start, end = csr.edge_range(current)
+            neighbors = zip(csr.targets[start:end], csr.costs[start:end])
+        else:
+            neighbors = edges.get(current, ())
+        for neighbor, edge_cost in neighbors:
             if neighbor in closed_set:
                 continue
                 
@@ -113,21 +105,13 @@ def astar(origin, destinations, edges, node_positions):
                 g_scores[neighbor] = tentative_g_score
                 
                 # Calculate heuristic
-                h_score = calculate_heuristic(neighbor, destinations, node_positions)
+                h_score = heuristic(neighbor)
                 
                 # Calculate f_score = g_score + h_score
                 f_score = tentative_g_score + h_score
                 
-                # Create new path
-                new_path = path + [neighbor]
-                
-                # Add neighbor to open set with adjusted priority for tie-breaking
-                entry_count += 1
-                # When all else is equal, nodes should be expanded in ascending order
-                # Add a small fraction based on node ID and entry count for tie-breaking
-                adjusted_f_score = f_score + (neighbor * 1e-9) + (entry_count * 1e-10)
-                
-                open_set.put((adjusted_f_score, tentative_g_score, neighbor, new_path))
+                # Add neighbor to the open set, replacing any worse entry (decrease-key)
+                open_set.push(neighbor, f_score, current)
     
     # No path found
     return None, nodes_generated, []
@@ -0,0 +1,190 @@
+import sys
+from graph import Graph, build_reverse_edges
+from input_parser import build_data
+from methods.heuristic import EuclideanHeuristic
+from methods.search_state import reconstruct_path
+from methods.frontier import PriorityFrontier
+
+def bastar(origin, destinations, edges, node_positions, reverse_edges=None,
+           heuristic=None, backward_heuristic=None, stats=None):
+    """
+    Bidirectional A* Search implementation.
+    - Runs A* forward from the origin and backward from every destination at once
+    - Both sides use the average potential p(v) = (h_t(v) - h_s(v)) / 2 (forward) and -p(v)
+      (backward), where h_t bounds the cost to the closest destination and h_s the cost
+      from the origin, so the two searches are consistent with each other
+    - Records the best meeting cost mu whenever an edge reaches a node labelled by the
+      other side, and stops as soon as the two smallest frontier keys add up to at least
+      mu, which proves mu optimal; there is no iteration limit
+    - Expands the side with the smaller key first (forward on ties); ties within a side
+      are broken by ascending node ID, then by insertion order
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        node_positions: Dictionary mapping node IDs to (x,y) coordinates
+        reverse_edges: Optional incoming-edge index (see Graph.reverse_edges)
+        heuristic: Optional callable bounding the cost from a node to the closest destination
+                   (e.g. LandmarkIndex.heuristic). Defaults to Euclidean distance.
+        backward_heuristic: Optional callable bounding the cost from the origin to a node
+                            (e.g. LandmarkIndex.backward_heuristic). Defaults to Euclidean distance.
+        stats: Optional SearchStats that records expansions, frontier activity (peak size per side)
+               and heuristic calls
+    
+    Returns:
+        tuple: (goal_reached, nodes_generated, path)
+            - goal_reached: The ID of the destination node that was reached
+            - nodes_generated: Number of nodes expanded by both searches
+            - path: List of node IDs representing the path from origin to goal
+    """
+    if reverse_edges is None:
+        reverse_edges = build_reverse_edges(edges)
+    # An infinite bound proves a node lies on no origin-destination path only for a heuristic
+    # such as ALT; an infinite Euclidean distance just means the node has no coordinates
+    proves_forward = heuristic is not None
+    proves_backward = backward_heuristic is not None
+    if heuristic is None:
+        heuristic = EuclideanHeuristic(destinations, node_positions, stats=stats)
+    if backward_heuristic is None:
+        backward_heuristic = EuclideanHeuristic([origin], node_positions, stats=stats)
+
+    inf = float('inf')
+    potentials = {}
+
+    def potential(node):
+        # Forward potential; None for nodes that provably lie on no origin-destination path
+        value = potentials.get(node)
+        if value is None and node not in potentials:
+            to_goal = heuristic(node)
+            from_origin = backward_heuristic(node)
+            if (to_goal == inf and proves_forward) or (from_origin == inf and proves_backward):
+                value = None
+            elif to_goal == inf or from_origin == inf:
+                raise _MissingCoordinates(node)
+            else:
+                value = (to_goal - from_origin) / 2
+            potentials[node] = value
+        return value
+
+    try:
+        return _bidirectional_search(origin, destinations, edges, reverse_edges, potential, stats)
+    except _MissingCoordinates:
+        # No consistent potential exists for a node without coordinates, so search
+        # again as plain bidirectional Dijkstra (zero potential everywhere)
+        return _bidirectional_search(origin, destinations, edges, reverse_edges, lambda node: 0, stats)
+
+class _MissingCoordinates(Exception):
+    # Raised by the default Euclidean potential for a node without coordinates
+    pass
+
+def _bidirectional_search(origin, destinations, edges, reverse_edges, potential, stats):
+    """
+    The search loop of bastar, for a given forward potential.
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        reverse_edges: Incoming-edge index (see Graph.reverse_edges)
+        potential: Callable returning the forward potential of a node, or None for nodes
+                   that provably lie on no origin-destination path
+        stats: Optional SearchStats
+    
+    Returns:
+        tuple: (goal_reached, nodes_generated, path), as returned by bastar
+    """
+    inf = float('inf')
+    # One (frontier, g_scores, parents, closed set, adjacency, potential sign) per side
+    forward = (PriorityFrontier(stats), {}, {}, set(), edges, 1)
+    backward = (PriorityFrontier(stats), {}, {}, set(), reverse_edges, -1)
+
+    best_cost = inf
+    meeting_node = None
+    nodes_generated = 0
+
+    if potential(origin) is not None:
+        forward[1][origin] = 0
+        forward[0].push(origin, potential(origin))
+    for dest in destinations:
+        if dest not in backward[1] and potential(dest) is not None:
+            backward[1][dest] = 0
+            backward[0].push(dest, -potential(dest))
+    if origin in backward[1] and origin in forward[1]:
+        best_cost, meeting_node = 0, origin
+
+    while True:
+        forward_key = forward[0].min_priority()
+        backward_key = backward[0].min_priority()
+        if forward_key is None or backward_key is None:
+            break
+        # Stopping rule: no path through an unexpanded node can beat mu
+        if forward_key + backward_key >= best_cost:
+            break
+
+        side, other = (forward, backward) if forward_key <= backward_key else (backward, forward)
+        frontier, g_scores, parents, closed, adjacency, sign = side
+        other_g_scores = other[1]
+
+        current, _, _ = frontier.pop()
+        closed.add(current)
+        nodes_generated += 1
+        if stats is not None:
+            stats.expand()
+        g_score = g_scores[current]
+
+        for neighbor, edge_cost in adjacency.get(current, []):
+            if neighbor in closed:
+                continue
+            neighbor_potential = potential(neighbor)
+            if neighbor_potential is None:
+                continue
+            tentative_g_score = g_score + edge_cost
+            if tentative_g_score < g_scores.get(neighbor, inf):
+                g_scores[neighbor] = tentative_g_score
+                parents[neighbor] = current
+                frontier.push(neighbor, tentative_g_score + sign * neighbor_potential)
+                # Meeting check on relaxation, against the other side's current label
+                if neighbor in other_g_scores and tentative_g_score + other_g_scores[neighbor] < best_cost:
+                    best_cost = tentative_g_score + other_g_scores[neighbor]
+                    meeting_node = neighbor
+
+    if meeting_node is None:
+        return None, nodes_generated, []
+
+    # Origin -> meeting node from the forward parents, then on to the goal through the backward ones.
+    # Parents are recorded on relaxation, so they also cover labelled nodes that were never expanded.
+    path = reconstruct_path(forward[2], meeting_node)
+    backward_parents = backward[2]
+    node = meeting_node
+    while node in backward_parents:
+        node = backward_parents[node]
+        path.append(node)
+    return node, nodes_generated, path
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python bastar_search.py <filename>")
+        return
+
+    filename = sys.argv[1]
+
+    # Use the common input parser
+    node_pos, edges, origin, destinations = build_data(filename)
+
+    # Create graph instance
+    graph = Graph(node_pos, edges)
+
+    # Run Bidirectional A* Search
+    goal, count, path = bastar(origin, destinations, edges, node_pos, graph.reverse_edges)
+
+    # Output in required format
+    print(f"{filename} BAS")
+    if path:
+        print(f"{goal} {count}")
+        print(" -> ".join(map(str, path)))
+    else:
+        print("No path found")
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,8 @@
 import sys
-import math
 import heapq
-from collections import defaultdict
-from graph import Graph
+from graph import Graph, build_reverse_edges
 from input_parser import build_data
-
-def calculate_heuristic(current_node, goal_nodes, node_positions):
-    """
-    Calculate the heuristic value (Euclidean distance) to the closest goal.
-    
-    Args:
-        current_node: The node for which to calculate the heuristic
-        goal_nodes: List of destination node IDs
-        node_positions: Dictionary mapping node IDs to their (x,y) coordinates
-        
-    Returns:
-        float: The minimum Euclidean distance to any goal node
-    """
-    if not goal_nodes:
-        return float('inf')
-        
-    # Find the minimum Euclidean distance to any goal
-    min_distance = float('inf')
-    for goal in goal_nodes:
-        if goal in node_positions and current_node in node_positions:
-            x1, y1 = node_positions[current_node]
-            x2, y2 = node_positions[goal]
-            distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            min_distance = min(min_distance, distance)
-    
-    return min_distance
+from methods.heuristic import EuclideanHeuristic
 
 class BidirectionalWeightedAStar:
     """
@@ -42,7 +15,8 @@ class BidirectionalWeightedAStar:
     4. Consistent tie-breaking: for reproducible results
     """
     
-    def __init__(self, origin, destinations, edges, node_positions):
+    def __init__(self, origin, destinations, edges, node_positions, reverse_edges=None,
+                 heuristic=None, backward_heuristic=None, stats=None):
         """
         Initialize the Bidirectional Weighted A* search.
         
@@ -51,12 +25,30 @@ class BidirectionalWeightedAStar:
             destinations: List of destination node IDs
             edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
             node_positions: Dictionary mapping node IDs to (x,y) coordinates
+            reverse_edges: Optional incoming-edge index (see Graph.reverse_edges).
+                           Built from edges when not provided.
+            heuristic: Optional callable estimating the cost from a node to the closest
+                       destination (e.g. LandmarkIndex.heuristic). Defaults to Euclidean distance.
+            backward_heuristic: Optional callable estimating the cost from the origin to a node
+                                (e.g. LandmarkIndex.backward_heuristic). Defaults to Euclidean distance.
+            stats: Optional SearchStats that records expansions, heap activity and heuristic calls
         """
         self.origin = origin
         self.destinations = destinations
         self.edges = edges
+        if reverse_edges is None:
+            reverse_edges = build_reverse_edges(edges)
+        self.reverse_edges = reverse_edges
         self.node_positions = node_positions
         
+        # Heuristics towards the destinations (forward) and the origin (backward)
+        if heuristic is None:
+            heuristic = EuclideanHeuristic(destinations, node_positions, stats=stats)
+        if backward_heuristic is None:
+            backward_heuristic = EuclideanHeuristic([origin], node_positions, stats=stats)
+        self.forward_heuristic = heuristic
+        self.backward_heuristic = backward_heuristic
+        
         # Search parameters
         self.initial_weight = 2.0  # Initial epsilon weight for heuristic
         self.min_weight = 1.0      # Minimum epsilon weight (1.0 = regular A*)
@@ -65,6 +57,7 @@ class BidirectionalWeightedAStar:
         
         # Statistics
         self.nodes_generated = 0
+        self.stats = stats
         
         # Forward search (from origin)
         self.forward_open = []     # Priority queue
@@ -98,19 +91,21 @@ class BidirectionalWeightedAStar:
         # Initialize the forward search (from origin)
         self.forward_g_scores[self.origin] = 0
         self.forward_parents[self.origin] = None
-        h_origin = calculate_heuristic(self.origin, self.destinations, self.node_positions)
+        h_origin = self.forward_heuristic(self.origin)
         heapq.heappush(self.forward_open, (h_origin * self.initial_weight, 0, self.entry_count, self.origin))
         self.entry_count += 1
         self.nodes_generated += 1
+        self._record_push()
         
         # Initialize the backward search (from each destination)
         for dest in self.destinations:
             self.backward_g_scores[dest] = 0
             self.backward_parents[dest] = None
-            h_dest = calculate_heuristic(dest, [self.origin], self.node_positions)
+            h_dest = self.backward_heuristic(dest)
             heapq.heappush(self.backward_open, (h_dest * self.initial_weight, 0, self.entry_count, dest))
             self.entry_count += 1
             self.nodes_generated += 1
+            self._record_push()
         
         # Current weight for the heuristic (dynamically adjusted)
         current_weight = self.initial_weight
@@ -165,10 +160,12 @@ class BidirectionalWeightedAStar:
         
         # Skip if already processed
         if current in self.forward_closed:
+            self._record_pop(stale=True)
             return None
         
         # Add to closed set
         self.forward_closed.add(current)
+        self._record_pop()
         
         # Check if the current node is a destination
         if current in self.destinations:
@@ -193,13 +190,14 @@ class BidirectionalWeightedAStar:
                 self.forward_parents[neighbor] = current
                 
                 # Calculate h-score (weighted)
-                h_score = calculate_heuristic(neighbor, self.destinations, self.node_positions)
+                h_score = self.forward_heuristic(neighbor)
                 f_score = tentative_g_score + h_score * current_weight
                 
                 # Add to open set with entry count for tie-breaking
                 heapq.heappush(self.forward_open, (f_score, tentative_g_score, self.entry_count, neighbor))
                 self.entry_count += 1
                 self.nodes_generated += 1
+                self._record_push()
         
         return current
     
@@ -221,10 +219,12 @@ class BidirectionalWeightedAStar:
         
         # Skip if already processed
         if current in self.backward_closed:
+            self._record_pop(stale=True)
             return None
         
         # Add to closed set
         self.backward_closed.add(current)
+        self._record_pop()
         
         # Check if the current node is the origin
         if current == self.origin:
@@ -232,17 +232,9 @@ class BidirectionalWeightedAStar:
             self._update_best_meeting(current, self.backward_g_scores[current])
             return current
         
-        # For backward search, we need to find nodes that can reach the current node
-        # Since edges are stored as (source -> [(dest, cost), ...]), we need to find all sources
-        # that have current as a destination
-        incoming_edges = []
-        for source, edges_list in self.edges.items():
-            for dest, cost in edges_list:
-                if dest == current:
-                    incoming_edges.append((source, cost))
-        
-        # Sort for consistent tie-breaking
-        incoming_edges.sort(key=lambda x: x[0])
+        # For backward search, we need the nodes that can reach the current node.
+        # The reverse index is already sorted by source for consistent tie-breaking.
+        incoming_edges = self.reverse_edges.get(current, [])
         
         for neighbor, cost in incoming_edges:
             if neighbor in self.backward_closed:
@@ -258,16 +250,31 @@ class BidirectionalWeightedAStar:
                 self.backward_parents[neighbor] = current
                 
                 # Calculate h-score (weighted)
-                h_score = calculate_heuristic(neighbor, [self.origin], self.node_positions)
+                h_score = self.backward_heuristic(neighbor)
                 f_score = tentative_g_score + h_score * current_weight
                 
                 # Add to open set with entry count for tie-breaking
                 heapq.heappush(self.backward_open, (f_score, tentative_g_score, self.entry_count, neighbor))
                 self.entry_count += 1
                 self.nodes_generated += 1
+                self._record_push()
         
         return current
     
+    def _record_push(self):
+        # Frontier size is counted over both open sets
+        if self.stats is not None:
+            self.stats.push(len(self.forward_open) + len(self.backward_open))
+    
+    def _record_pop(self, stale=False):
+        # A pop of a node that is already closed is stale; any other pop expands the node
+        if self.stats is not None:
+            if stale:
+                self.stats.stale()
+            else:
+                self.stats.pop()
+                self.stats.expand()
+    
     def _check_meeting_criteria(self, node):
         """
         Check if the node represents a meeting point between forward and backward searches.
@@ -351,7 +358,8 @@ class BidirectionalWeightedAStar:
         
         return complete_path
 
-def bdwa(origin, destinations, edges, node_positions):
+def bdwa(origin, destinations, edges, node_positions, reverse_edges=None,
+         heuristic=None, backward_heuristic=None, stats=None):
     """
     Bidirectional Weighted A* with Dynamic Weighting implementation.
     - Uses simultaneous search from origin and destinations
@@ -364,6 +372,10 @@ def bdwa(origin, destinations, edges, node_positions):
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
         node_positions: Dictionary mapping node IDs to (x,y) coordinates
+        reverse_edges: Optional incoming-edge index (see Graph.reverse_edges)
+        heuristic: Optional forward heuristic (cost from a node to the closest destination)
+        backward_heuristic: Optional backward heuristic (cost from the origin to a node)
+        stats: Optional SearchStats that records expansions, heap activity and heuristic calls
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -372,7 +384,8 @@ def bdwa(origin, destinations, edges, node_positions):
             - path: List of node IDs representing the path from origin to goal
     """
     # Create and run the bidirectional weighted A* search
-    search = BidirectionalWeightedAStar(origin, destinations, edges, node_positions)
+    search = BidirectionalWeightedAStar(origin, destinations, edges, node_positions, reverse_edges,
+                                        heuristic, backward_heuristic, stats)
     return search.search()
 
 def main():
@@ -389,7 +402,7 @@ def main():
     graph = Graph(node_pos, edges)
     
     # Run Bidirectional Weighted A* Search
-    goal, count, path = bdwa(origin, destinations, edges, node_pos)
+    goal, count, path = bdwa(origin, destinations, edges, node_pos, graph.reverse_edges)
 
     # Output in required format
     print(f"{filename} CUS2")
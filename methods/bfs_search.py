@@ -1,9 +1,10 @@
 import sys
 from collections import deque
-from graph import Graph
+from graph import Graph, CSRAdjacency
 from input_parser import build_data
+from methods.search_state import reconstruct_path
 
-def bfs(origin, destinations, edges):
+def bfs(origin, destinations, edges, stats=None):
     """
     Breadth-First Search implementation.
     - Expands nodes in ascending order when equal
@@ -14,6 +15,7 @@ def bfs(origin, destinations, edges):
         origin: The starting node ID
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        stats: Optional SearchStats that records expansions, pushes and pops
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -21,25 +23,43 @@ def bfs(origin, destinations, edges):
             - nodes_generated: Number of nodes generated during search
             - path: List of node IDs representing the path from origin to goal
     """
-    queue = deque([(origin, [origin])])  # Store node and its path
-    visited = set()
+    queue = deque([origin])
+    came_from = {}  # Parent map used to rebuild the path once a goal is reached
+    seen = set()    # Every node that has been added to the queue
+    goal_set = set(destinations)
     nodes_generated = 0
+    # Compiled graphs keep their edges in CSR arrays, read directly without building tuples
+    csr = edges if isinstance(edges, CSRAdjacency) else None
+    if stats is not None:
+        stats.push(1)
     
     while queue:
-        current, path = queue.popleft()
+        current = queue.popleft()
         nodes_generated += 1
+        if stats is not None:
+            stats.pop()
+            stats.expand()
         
-        if current in destinations:
-            return current, nodes_generated, path
+        if current in goal_set:
+            return current, nodes_generated, reconstruct_path(came_from, current)
             
         # Get all neighbors and sort in ascending order
-        neighbors = sorted(edges.get(current, []), key=lambda x: x[0])
+        if csr is not None:
+            start, end = csr.edge_range(current)
+            neighbors = sorted(csr.targets[start:end])
+        else:
+            neighbors = sorted([neighbor for neighbor, _ in edges.get(current, ())])
         
-        for neighbor, _ in neighbors:
-            if neighbor not in visited and neighbor not in [n for n, _ in queue]:
-                visited.add(neighbor)
-                new_path = path + [neighbor]
-                queue.append((neighbor, new_path))
+        for neighbor in neighbors:
+            if neighbor not in seen:
+                seen.add(neighbor)
+                # The origin is not marked as seen up front, so it may be queued
+                # (and counted) once more; it keeps no parent so paths stay acyclic.
+                if neighbor != origin:
+                    came_from[neighbor] = current
+                queue.append(neighbor)
+                if stats is not None:
+                    stats.push(len(queue))
                 
     return None, nodes_generated, []
 
@@ -0,0 +1,392 @@
+import sys
+import heapq
+import struct
+from array import array
+from graph import Graph
+from input_parser import build_data
+
+# -----------------------------------------------------------------------------
+# Contraction Hierarchies
+#
+# Preprocessing contracts the nodes one by one, least important first (by edge
+# difference). Contracting a node v removes it from the remaining graph and adds a
+# shortcut u -> w for every pair of remaining neighbors whose shortest path runs
+# through v. Every node ends up with a rank, and a query only relaxes edges that
+# lead to higher-ranked nodes, from both ends, which explores a tiny part of the
+# graph. Shortcuts remember the node they skip so paths can be unpacked back into
+# original edges.
+# -----------------------------------------------------------------------------
+
+CH_MAGIC = b"RGCH\x00\x00\x00\x01"
+
+# magic, number of nodes, number of upward (forward) edges, number of upward (backward) edges
+CH_HEADER = struct.Struct("<8sqqq")
+
+NO_MIDDLE = -1  # Middle node of an original edge (not a shortcut)
+
+class ContractionHierarchy:
+    """
+    A contracted graph: node ranks plus the upward edges of the forward and backward searches.
+
+    Attributes:
+        rank: Dictionary mapping node IDs to their contraction order (higher = more important)
+        up_out: Dictionary mapping u to a list of (w, cost, middle) for edges u -> w with rank[w] > rank[u]
+        up_in: Dictionary mapping w to a list of (u, cost, middle) for edges u -> w with rank[u] > rank[w]
+        middle: Dictionary mapping each shortcut (u, w) to the node it bypasses
+    """
+
+    def __init__(self, rank, up_out, up_in):
+        self.rank = rank
+        self.up_out = up_out
+        self.up_in = up_in
+        self.middle = {}
+        for u, adjacency in up_out.items():
+            for w, _, mid in adjacency:
+                if mid != NO_MIDDLE:
+                    self.middle[(u, w)] = mid
+        for w, adjacency in up_in.items():
+            for u, _, mid in adjacency:
+                if mid != NO_MIDDLE:
+                    self.middle[(u, w)] = mid
+
+    @property
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    @classmethod
+    def build(cls, edges, nodes=(), witness_settle_limit=50):
+        """
+        Builds the hierarchy for a graph.
+
+        Args:
+            edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+            nodes: Optional iterable of node IDs without edges that should still get a rank
+            witness_settle_limit: Maximum nodes settled by each witness search; when a search
+                                  gives up, the shortcut is added anyway (always correct).
+                                  Lower limits add many more shortcuts (on a 100x100 grid,
+                                  465k at 5 against 67k at 50), higher ones build more slowly
+                                  for few savings (65k at 200)
+
+        Returns:
+            ContractionHierarchy: The contracted graph
+        """
+        # Remaining graph, keeping only the cheapest of any parallel edges
+        out_adj = {}
+        in_adj = {}
+        for node in nodes:
+            out_adj.setdefault(node, {})
+            in_adj.setdefault(node, {})
+        for u, adjacency in edges.items():
+            out_adj.setdefault(u, {})
+            in_adj.setdefault(u, {})
+            for w, cost in adjacency:
+                out_adj.setdefault(w, {})
+                in_adj.setdefault(w, {})
+                if u == w:
+                    continue
+                if w not in out_adj[u] or cost < out_adj[u][w][0]:
+                    out_adj[u][w] = (cost, NO_MIDDLE)
+                    in_adj[w][u] = (cost, NO_MIDDLE)
+
+        contracted_neighbors = dict.fromkeys(out_adj, 0)
+        rank = {}
+        up_out = {}
+        up_in = {}
+
+        def witness_distance(source, target_limit, excluded, targets):
+            # Dijkstra from source in the remaining graph without excluded, up to target_limit
+            distances = {source: 0}
+            heap = [(0, source)]
+            settled = 0
+            remaining = set(targets)
+            while heap and remaining and settled < witness_settle_limit:
+                dist, node = heapq.heappop(heap)
+                if dist > distances.get(node, float('inf')):
+                    continue
+                if dist > target_limit:
+                    break
+                settled += 1
+                remaining.discard(node)
+                for nxt, (cost, _) in out_adj[node].items():
+                    if nxt == excluded:
+                        continue
+                    new_dist = dist + cost
+                    if new_dist < distances.get(nxt, float('inf')):
+                        distances[nxt] = new_dist
+                        heapq.heappush(heap, (new_dist, nxt))
+            return distances
+
+        def shortcuts_for(v):
+            # Shortcuts (u, w, cost) needed if v were contracted now
+            shortcuts = []
+            outgoing = out_adj[v]
+            for u, (cost_uv, _) in in_adj[v].items():
+                targets = [w for w in outgoing if w != u]
+                if not targets:
+                    continue
+                limit = cost_uv + max(outgoing[w][0] for w in targets)
+                distances = witness_distance(u, limit, v, targets)
+                for w in targets:
+                    via_v = cost_uv + outgoing[w][0]
+                    if distances.get(w, float('inf')) > via_v:
+                        shortcuts.append((u, w, via_v))
+            return shortcuts
+
+        def priority(v, shortcuts):
+            # Edge difference, plus the number of already contracted neighbors to spread contraction
+            removed = len(in_adj[v]) + len(out_adj[v])
+            return len(shortcuts) - removed + contracted_neighbors[v]
+
+        queue = [(priority(v, shortcuts_for(v)), v) for v in out_adj]
+        heapq.heapify(queue)
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: re-evaluate and put back if it is no longer the minimum
+            shortcuts = shortcuts_for(v)
+            current = priority(v, shortcuts)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            rank[v] = len(rank)
+            up_out[v] = sorted((w, cost, mid) for w, (cost, mid) in out_adj[v].items())
+            up_in[v] = sorted((u, cost, mid) for u, (cost, mid) in in_adj[v].items())
+
+            for u, w, cost in shortcuts:
+                if w not in out_adj[u] or cost < out_adj[u][w][0]:
+                    out_adj[u][w] = (cost, v)
+                    in_adj[w][u] = (cost, v)
+
+            # Remove v from the remaining graph
+            for w in out_adj[v]:
+                del in_adj[w][v]
+                contracted_neighbors[w] += 1
+            for u in in_adj[v]:
+                del out_adj[u][v]
+                contracted_neighbors[u] += 1
+            del out_adj[v]
+            del in_adj[v]
+
+        return cls(rank, up_out, up_in)
+
+    def save(self, filename):
+        """
+        Writes the hierarchy to a binary file (see load).
+        """
+        node_ids = array("q", sorted(self.rank))
+        ranks = array("q", (self.rank[node] for node in node_ids))
+        sections = []
+        for adjacency in (self.up_out, self.up_in):
+            offsets = array("q", [0])
+            targets = array("q")
+            costs = array("d")
+            middles = array("q")
+            for node in node_ids:
+                for other, cost, mid in adjacency.get(node, ()):
+                    targets.append(other)
+                    costs.append(cost)
+                    middles.append(mid)
+                offsets.append(len(targets))
+            sections.append((offsets, targets, costs, middles))
+
+        with open(filename, "wb") as file:
+            file.write(CH_HEADER.pack(CH_MAGIC, len(node_ids), len(sections[0][1]), len(sections[1][1])))
+            node_ids.tofile(file)
+            ranks.tofile(file)
+            for section in sections:
+                for values in section:
+                    values.tofile(file)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads a hierarchy written by save.
+
+        Raises:
+            ValueError: If the file is not a contraction hierarchy
+        """
+        with open(filename, "rb") as file:
+            magic, num_nodes, num_out, num_in = CH_HEADER.unpack(file.read(CH_HEADER.size))
+            if magic != CH_MAGIC:
+                raise ValueError(f"{filename} is not a contraction hierarchy file")
+
+            def read(typecode, count):
+                values = array(typecode)
+                values.fromfile(file, count)
+                return values
+
+            node_ids = read("q", num_nodes)
+            ranks = read("q", num_nodes)
+            adjacencies = []
+            for num_edges in (num_out, num_in):
+                offsets = read("q", num_nodes + 1)
+                targets = read("q", num_edges)
+                costs = read("d", num_edges)
+                middles = read("q", num_edges)
+                adjacency = {}
+                for i, node in enumerate(node_ids):
+                    adjacency[node] = [(targets[j], costs[j], middles[j]) for j in range(offsets[i], offsets[i + 1])]
+                adjacencies.append(adjacency)
+
+        return cls(dict(zip(node_ids, ranks)), adjacencies[0], adjacencies[1])
+
+    def unpack_edge(self, u, w):
+        """
+        Expands an edge of the hierarchy into the original nodes it covers, excluding u.
+        """
+        nodes = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            mid = self.middle.get((a, b))
+            if mid is None:
+                nodes.append(b)
+            else:
+                # Expand a -> mid before mid -> b
+                stack.append((mid, b))
+                stack.append((a, mid))
+        return nodes
+
+    def query(self, origin, destinations, stats=None):
+        """
+        Bidirectional upward Dijkstra search between origin and the closest destination.
+        An optional SearchStats records settled nodes and heap pushes and pops.
+
+        Returns:
+            tuple: (goal_reached, nodes_generated, path)
+                - nodes_generated: Number of nodes settled by both searches
+                - path: Original node IDs from origin to goal
+        """
+        if origin not in self.rank:
+            return None, 0, []
+
+        forward_dist = {origin: 0}
+        forward_parent = {}
+        forward_heap = [(0, origin)]
+        backward_dist = {}
+        backward_parent = {}
+        backward_heap = []
+        for dest in destinations:
+            if dest in self.rank and dest not in backward_dist:
+                backward_dist[dest] = 0
+                backward_heap.append((0, dest))
+        heapq.heapify(backward_heap)
+        if stats is not None:
+            # One push per start entry (origin and destinations)
+            for size in range(1, len(forward_heap) + len(backward_heap) + 1):
+                stats.push(size)
+
+        best_cost = float('inf')
+        meeting_node = None
+        nodes_generated = 0
+        settled = [set(), set()]
+
+        searches = ((forward_heap, forward_dist, forward_parent, backward_dist, self.up_out, settled[0]),
+                    (backward_heap, backward_dist, backward_parent, forward_dist, self.up_in, settled[1]))
+
+        # Each side stops once its smallest key cannot improve the best meeting cost
+        while (forward_heap and forward_heap[0][0] < best_cost) or (backward_heap and backward_heap[0][0] < best_cost):
+            for heap, dist, parent, other_dist, upward, done in searches:
+                if not heap or heap[0][0] >= best_cost:
+                    continue
+                d, node = heapq.heappop(heap)
+                if node in done:
+                    if stats is not None:
+                        stats.stale()
+                    continue
+                done.add(node)
+                nodes_generated += 1
+                if stats is not None:
+                    stats.pop()
+                    stats.expand()
+
+                if node in other_dist and d + other_dist[node] < best_cost:
+                    best_cost = d + other_dist[node]
+                    meeting_node = node
+
+                for nxt, cost, _ in upward.get(node, ()):
+                    new_dist = d + cost
+                    if new_dist < dist.get(nxt, float('inf')):
+                        dist[nxt] = new_dist
+                        parent[nxt] = node
+                        heapq.heappush(heap, (new_dist, nxt))
+                        if stats is not None:
+                            stats.push(len(forward_heap) + len(backward_heap))
+                        if nxt in other_dist and new_dist + other_dist[nxt] < best_cost:
+                            best_cost = new_dist + other_dist[nxt]
+                            meeting_node = nxt
+
+        if meeting_node is None:
+            return None, nodes_generated, []
+
+        # Origin -> meeting node, then meeting node -> destination, unpacking shortcuts
+        forward_chain = [meeting_node]
+        while forward_chain[-1] in forward_parent:
+            forward_chain.append(forward_parent[forward_chain[-1]])
+        forward_chain.reverse()
+
+        path = [origin]
+        for u, w in zip(forward_chain, forward_chain[1:]):
+            path.extend(self.unpack_edge(u, w))
+        node = meeting_node
+        while node in backward_parent:
+            nxt = backward_parent[node]
+            path.extend(self.unpack_edge(node, nxt))
+            node = nxt
+
+        return node, nodes_generated, path
+
+def ch(origin, destinations, edges, hierarchy=None, stats=None):
+    """
+    Contraction Hierarchies query.
+    - Uses a precomputed hierarchy (built here if not provided)
+    - Runs an upward bidirectional Dijkstra search between origin and destinations
+    - Returns a lowest-cost path with shortcuts unpacked into original node IDs
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        hierarchy: Optional ContractionHierarchy built from the same edges
+        stats: Optional SearchStats that records the query's settled nodes and heap activity
+        
+    Returns:
+        tuple: (goal_reached, nodes_generated, path)
+            - goal_reached: The ID of the destination node that was reached
+            - nodes_generated: Number of nodes settled by the query
+            - path: List of node IDs representing the path from origin to goal
+    """
+    if hierarchy is None:
+        hierarchy = ContractionHierarchy.build(edges)
+    return hierarchy.query(origin, destinations, stats)
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python ch_search.py <filename> [hierarchy_file]")
+        return
+
+    filename = sys.argv[1]
+
+    # Use the common input parser
+    node_pos, edges, origin, destinations = build_data(filename)
+
+    # Create graph instance
+    graph = Graph(node_pos, edges)
+
+    # Use a saved hierarchy if given, otherwise build one
+    hierarchy = ContractionHierarchy.load(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    # Run Contraction Hierarchies query
+    goal, count, path = ch(origin, destinations, edges, hierarchy)
+
+    # Output in required format
+    print(f"{filename} CH")
+    if path:
+        print(f"{goal} {count}")
+        print(" -> ".join(map(str, path)))
+    else:
+        print("No path found")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import sys
-from graph import Graph
+from graph import Graph, CSRAdjacency
 from input_parser import build_data
+from methods.search_state import reconstruct_path
 
-def dfs(origin, destinations, edges):
+def dfs(origin, destinations, edges, stats=None):
     """
     Depth-First Search implementation.
     - Expands nodes in ascending order when equal
@@ -13,6 +14,7 @@ def dfs(origin, destinations, edges):
         origin: The starting node ID
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        stats: Optional SearchStats that records expansions, pushes and pops
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -20,29 +22,46 @@ def dfs(origin, destinations, edges):
             - nodes_generated: Number of nodes generated during search
             - path: List of node IDs representing the path from origin to goal
     """
-    stack = [(origin, [origin])]  # Store node and its path
+    stack = [(origin, None)]  # Store node and the node it was reached from
     visited = set()
+    came_from = {}
     nodes_generated = 0
+    # Compiled graphs keep their edges in CSR arrays, read directly without building tuples
+    csr = edges if isinstance(edges, CSRAdjacency) else None
+    if stats is not None:
+        stats.push(1)
 
     while stack:
-        current, path = stack.pop()
+        current, parent = stack.pop()
         if current in visited:
+            if stats is not None:
+                stats.stale()
             continue
+        if stats is not None:
+            stats.pop()
+            stats.expand()
             
         visited.add(current)
+        if parent is not None:
+            came_from[current] = parent
         nodes_generated += 1
 
         if current in destinations:
-            return current, nodes_generated, path
+            return current, nodes_generated, reconstruct_path(came_from, current)
 
         # Get neighbors and sort in descending order (since we're using a stack)
         # This ensures we process smaller numbers first when expanding
-        neighbors = sorted(edges.get(current, []), key=lambda x: x[0], reverse=True)
+        if csr is not None:
+            start, end = csr.edge_range(current)
+            neighbors = sorted(csr.targets[start:end], reverse=True)
+        else:
+            neighbors = sorted([neighbor for neighbor, _ in edges.get(current, ())], reverse=True)
         
-        for neighbor, _ in neighbors:
+        for neighbor in neighbors:
             if neighbor not in visited:
-                new_path = path + [neighbor]
-                stack.append((neighbor, new_path))
+                stack.append((neighbor, current))
+                if stats is not None:
+                    stats.push(len(stack))
 
     return None, nodes_generated, []
 
@@ -0,0 +1,127 @@
+# frontier.py
+# A reusable priority frontier for the informed searches (GBFS, A*, ...).
+# It wraps heapq directly, so there is no locking on push/pop as there is with
+# queue.PriorityQueue, and breaks ties with exact integer keys instead of small
+# float offsets added to the priority.
+
+from heapq import heapify, heappush, heappop
+from itertools import count
+
+class PriorityFrontier:
+    """
+    Min-priority frontier with decrease-key by lazy deletion.
+
+    Entries are ordered by (priority, node, insertion order), so when priorities are
+    equal nodes are expanded in ascending order of ID, and a node pushed earlier comes
+    before the same node pushed later. The comparison is exact for any node ID.
+
+    A node has at most one live entry. Pushing a node that is already in the frontier
+    replaces its entry only if the new priority is strictly lower; the old entry stays
+    in the heap and is skipped (counted in stale_pops) when it reaches the top.
+    """
+
+    def __init__(self, stats=None):
+        """
+        Args:
+            stats: Optional SearchStats that records pushes, pops, stale pops and the peak size
+        """
+        self._heap = []
+        self._entries = {}       # node -> its live heap entry
+        self._counter = count()  # Insertion order, for chronological tie-breaking
+        self.stale_pops = 0      # Number of replaced entries discarded by pop
+        self.stats = stats
+
+    def push(self, node, priority, data=None):
+        """
+        Adds a node to the frontier, or lowers its priority if it is already there.
+
+        Args:
+            node: The node ID
+            priority: The node's priority (lower is expanded first)
+            data: Optional payload returned with the node by pop (e.g. its parent)
+
+        Returns:
+            bool: True if the entry was added or updated, False if the existing entry was kept
+        """
+        entry = self._entries.get(node)
+        if entry is not None and entry[0] <= priority:
+            return False
+
+        entry = (priority, node, next(self._counter), data)
+        self._entries[node] = entry
+        heappush(self._heap, entry)
+        if self.stats is not None:
+            self.stats.push(len(self._entries))
+        return True
+
+    def pop(self):
+        """
+        Removes and returns the entry with the lowest priority.
+
+        Returns:
+            tuple: (node, priority, data)
+
+        Raises:
+            IndexError: If the frontier is empty
+        """
+        heap = self._heap
+        entries = self._entries
+        while heap:
+            entry = heappop(heap)
+            node = entry[1]
+            if entries.get(node) is entry:
+                del entries[node]
+                if self.stats is not None:
+                    self.stats.pop()
+                return node, entry[0], entry[3]
+            self.stale_pops += 1
+            if self.stats is not None:
+                self.stats.stale()
+        raise IndexError("pop from an empty frontier")
+
+    def min_priority(self):
+        """
+        Returns the lowest priority in the frontier without removing its entry,
+        or None if the frontier is empty.
+        """
+        heap = self._heap
+        entries = self._entries
+        while heap:
+            entry = heap[0]
+            if entries.get(entry[1]) is entry:
+                return entry[0]
+            heappop(heap)
+            self.stale_pops += 1
+            if self.stats is not None:
+                self.stats.stale()
+        return None
+
+    def reprioritize(self, priority_of):
+        """
+        Recomputes the priority of every node in the frontier, for searches whose
+        heuristic changes while they run. Insertion order is kept for tie-breaking.
+
+        Args:
+            priority_of: Callable taking (node, old_priority, data) and returning the new priority
+        """
+        entries = self._entries
+        for node, (priority, _, seq, data) in list(entries.items()):
+            entries[node] = (priority_of(node, priority, data), node, seq, data)
+        self._heap = list(entries.values())
+        heapify(self._heap)
+
+    def priority(self, node):
+        """
+        Returns the current priority of a node in the frontier, or None if it is not there.
+        """
+        entry = self._entries.get(node)
+        return entry[0] if entry is not None else None
+
+    def __contains__(self, node):
+        return node in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
@@ -1,37 +1,11 @@
 import sys
-import math
-from queue import PriorityQueue
-from graph import Graph
+from graph import Graph, CSRAdjacency
 from input_parser import build_data
+from methods.heuristic import EuclideanHeuristic
+from methods.search_state import reconstruct_path
+from methods.frontier import PriorityFrontier
 
-def calculate_heuristic(current_node, goal_nodes, node_positions):
-    """
-    Calculate the heuristic value (Euclidean distance) to the closest goal.
-    For GBFS, we only use the cost to reach the goal from the current node.
-    
-    Args:
-        current_node: The node for which to calculate the heuristic
-        goal_nodes: List of destination nodes
-        node_positions: Dictionary mapping node IDs to their (x,y) coordinates
-        
-    Returns:
-        float: The minimum Euclidean distance to any goal node
-    """
-    if not goal_nodes:
-        return float('inf')
-        
-    # Find the minimum Euclidean distance to any goal
-    min_distance = float('inf')
-    for goal in goal_nodes:
-        if goal in node_positions and current_node in node_positions:
-            x1, y1 = node_positions[current_node]
-            x2, y2 = node_positions[goal]
-            distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            min_distance = min(min_distance, distance)
-    
-    return min_distance
-
-def gbfs(origin, destinations, edges, node_positions):
+def gbfs(origin, destinations, edges, node_positions, stats=None, heuristic=None):
     """
     Greedy Best-First Search implementation.
     - Uses a priority queue to always expand the node with smallest heuristic
@@ -43,6 +17,9 @@ def gbfs(origin, destinations, edges, node_positions):
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
         node_positions: Dictionary mapping node IDs to (x,y) coordinates
+        stats: Optional SearchStats that records expansions, frontier activity and heuristic calls
+        heuristic: Optional callable returning the estimated cost from a node to the closest
+                   destination (e.g. a HeuristicTable). Defaults to the Euclidean distance.
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -51,48 +28,46 @@ def gbfs(origin, destinations, edges, node_positions):
             - path: List of node IDs representing the path from origin to goal
     """
     # Initialize data structures
-    frontier = PriorityQueue()
-    frontier.put((0, origin, [origin]))  # (priority, node, path)
+    # Ties on the heuristic are broken by node ID, then by insertion order
+    frontier = PriorityFrontier(stats)
+    frontier.push(origin, 0)  # node, priority, parent
     visited = set()
+    came_from = {}
     nodes_generated = 0
     
-    # For tracking equal-priority nodes to maintain chronological order
-    entry_count = 0
+    # Distance to the closest goal, indexed and memoized for this search
+    if heuristic is None:
+        heuristic = EuclideanHeuristic(destinations, node_positions, stats=stats)
     
-    while not frontier.empty():
+    # Compiled graphs keep their edges in CSR arrays, read directly without building tuples
+    csr = edges if isinstance(edges, CSRAdjacency) else None
+    
+    while frontier:
         # Get node with lowest heuristic value
-        priority, current, path = frontier.get()
+        current, priority, parent = frontier.pop()
         
-        if current in visited:
-            continue
-            
         visited.add(current)
+        if parent is not None:
+            came_from[current] = parent
         nodes_generated += 1
+        if stats is not None:
+            stats.expand()
         
         # Check if we've reached a destination
         if current in destinations:
-            return current, nodes_generated, path
+            return current, nodes_generated, reconstruct_path(came_from, current)
         
-        # Get all neighbors
-        neighbors = []
-        for neighbor, _ in edges.get(current, []):
+        # Add unvisited neighbors to the frontier. A node that is already on the
+        # frontier keeps its earlier entry, since its heuristic value is the same.
+        if csr is not None:
+            start, end = csr.edge_range(current)
+            neighbors = zip(csr.targets[start:end], csr.costs[start:end])
+        else:
+            neighbors = edges.get(current, ())
+        for neighbor, _ in neighbors:
             if neighbor not in visited:
-                # Calculate heuristic to goal
-                h = calculate_heuristic(neighbor, destinations, node_positions)
-                neighbors.append((neighbor, h))
-        
-        # Sort neighbors by heuristic value, then by node ID for tiebreaking
-        neighbors.sort(key=lambda x: (x[1], x[0]))
-        
-        # Add neighbors to frontier
-        for neighbor, h in neighbors:
-            new_path = path + [neighbor]
-            entry_count += 1
-            # When all else is equal, nodes should be expanded in ascending order
-            # Add a small fraction to the priority based on the node ID
-            # Add another smaller fraction based on entry count for chronological order
-            adjusted_priority = h + (neighbor * 1e-9) + (entry_count * 1e-10)
-            frontier.put((adjusted_priority, neighbor, new_path))
+                h = heuristic(neighbor)
+                frontier.push(neighbor, h, current)
     
     # No path found
     return None, nodes_generated, []
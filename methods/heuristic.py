@@ -0,0 +1,233 @@
+# heuristic.py
+# Shared Euclidean heuristic for the informed searches (GBFS, A*, CUS2).
+# calculate_heuristic is the plain function the methods have always used.
+# EuclideanHeuristic answers the same question for one search: it indexes the
+# goal coordinates once (in a KD-tree when there are many goals) and memoizes
+# the value of every node it is asked about. HeuristicTable instead computes the
+# value of every node up front, vectorized with NumPy when it is installed, so a
+# search only does one indexed read per lookup.
+
+import math
+
+# The numpy module once _import_numpy has run (False if it is not installed)
+_numpy = None
+
+def _import_numpy():
+    """
+    Returns the numpy module, or None if it is not installed. NumPy is optional and only
+    HeuristicTable uses it, so it is imported on first use rather than with this module.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:  # HeuristicTable falls back to pure Python
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+def calculate_heuristic(current_node, goal_nodes, node_positions):
+    """
+    Calculate the heuristic value (Euclidean distance) to the closest goal.
+    
+    Args:
+        current_node: The node for which to calculate the heuristic
+        goal_nodes: List of destination node IDs
+        node_positions: Dictionary mapping node IDs to their (x,y) coordinates
+        
+    Returns:
+        float: The minimum Euclidean distance to any goal node
+    """
+    if not goal_nodes:
+        return float('inf')
+        
+    # Find the minimum Euclidean distance to any goal
+    min_distance = float('inf')
+    for goal in goal_nodes:
+        if goal in node_positions and current_node in node_positions:
+            x1, y1 = node_positions[current_node]
+            x2, y2 = node_positions[goal]
+            distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+            min_distance = min(min_distance, distance)
+    
+    return min_distance
+
+# Below this many goals a linear scan is cheaper than walking a KD-tree.
+KD_TREE_MIN_GOALS = 8
+
+class _KDTree:
+    """
+    Static 2-D tree over goal coordinates, answering nearest squared distance queries.
+    Each tree node is a tuple (point, axis, left, right).
+    """
+
+    def __init__(self, points):
+        self.root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 2
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        return (points[mid], axis,
+                self._build(points[:mid], depth + 1),
+                self._build(points[mid + 1:], depth + 1))
+
+    def nearest_squared_distance(self, x, y):
+        """
+        Returns the smallest squared Euclidean distance from (x, y) to any point in the tree.
+        """
+        best = float('inf')
+        # Each stack item is (subtree, squared distance to its splitting line).
+        stack = [(self.root, 0)]
+        while stack:
+            node, bound = stack.pop()
+            if node is None or bound >= best:
+                continue
+            (px, py), axis, left, right = node
+            distance = (px - x)**2 + (py - y)**2
+            if distance < best:
+                best = distance
+            diff = (x - px) if axis == 0 else (y - py)
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the near side first; the far side only matters if the
+            # splitting line is closer than the best point found so far.
+            stack.append((far, diff * diff))
+            stack.append((near, 0))
+        return best
+
+class EuclideanHeuristic:
+    """
+    Euclidean distance to the closest goal, set up once per search.
+
+    Calling the object with a node ID returns exactly what calculate_heuristic would
+    return for the same goals, but each node is only computed once, and with many
+    goals the nearest one is found through a KD-tree instead of a full scan.
+    Memoization can be turned off by searches that must run in bounded memory.
+    """
+
+    def __init__(self, goal_nodes, node_positions, memoize=True, stats=None):
+        """
+        Args:
+            goal_nodes: List of destination node IDs
+            node_positions: Dictionary mapping node IDs to their (x,y) coordinates
+            memoize: Whether to remember the value of every node asked about
+            stats: Optional SearchStats that counts the calls
+        """
+        self.node_positions = node_positions
+        self.goal_points = [node_positions[goal] for goal in goal_nodes if goal in node_positions]
+        self.tree = _KDTree(self.goal_points) if len(self.goal_points) >= KD_TREE_MIN_GOALS else None
+        self.cache = {} if memoize else None
+        self.stats = stats
+
+    def __call__(self, node):
+        if self.stats is not None:
+            self.stats.heuristic()
+        if self.cache is None:
+            return self._compute(node)
+        value = self.cache.get(node)
+        if value is None:
+            value = self._compute(node)
+            self.cache[node] = value
+        return value
+
+    def _compute(self, node):
+        if node not in self.node_positions or not self.goal_points:
+            return float('inf')
+        x1, y1 = self.node_positions[node]
+        if self.tree is not None:
+            return math.sqrt(self.tree.nearest_squared_distance(x1, y1))
+        min_distance = float('inf')
+        for x2, y2 in self.goal_points:
+            distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+            min_distance = min(min_distance, distance)
+        return min_distance
+
+class HeuristicTable:
+    """
+    Euclidean distance to the closest goal, precomputed for every node with coordinates.
+
+    Calling the object with a node ID returns exactly what EuclideanHeuristic would
+    return, as a single list read. Building the table costs one pass over all nodes
+    and goals, so it pays off for searches that touch a large part of the graph, or
+    when the same goal set is searched many times. Build one table for the
+    destinations (forward searches) and one for [origin] (backward searches).
+    """
+
+    def __init__(self, node_ids, values, stats=None):
+        """
+        Args:
+            node_ids: Sorted list of the node IDs that have coordinates
+            values: List of heuristic values, parallel to node_ids
+            stats: Optional SearchStats that counts the calls
+        """
+        self.values = values
+        self.stats = stats
+        # Contiguous IDs (the usual case) are looked up by offset, without a dictionary
+        if node_ids and node_ids[-1] - node_ids[0] == len(node_ids) - 1:
+            self.base = node_ids[0]
+            self.index = None
+        else:
+            self.base = None
+            self.index = {node: i for i, node in enumerate(node_ids)}
+
+    @classmethod
+    def build(cls, goal_nodes, node_positions, use_numpy=None, stats=None):
+        """
+        Computes the table for a goal set.
+
+        Args:
+            goal_nodes: List of goal node IDs
+            node_positions: Dictionary (or mapping) of node IDs to their (x,y) coordinates
+            use_numpy: True/False to force a code path; by default NumPy is used when installed
+            stats: Optional SearchStats that counts the calls made to the table
+
+        Returns:
+            HeuristicTable: The table
+        """
+        node_ids = sorted(node_positions)
+        goal_points = [node_positions[goal] for goal in goal_nodes if goal in node_positions]
+        if use_numpy is None:
+            use_numpy = _import_numpy() is not None
+        if not goal_points:
+            values = [float('inf')] * len(node_ids)
+        elif use_numpy:
+            if _import_numpy() is None:
+                raise ImportError("NumPy is not installed")
+            values = _numpy_distances(node_ids, goal_points, node_positions)
+        else:
+            heuristic = EuclideanHeuristic(goal_nodes, node_positions, memoize=False)
+            values = [heuristic._compute(node) for node in node_ids]
+        return cls(node_ids, values, stats)
+
+    def __call__(self, node):
+        if self.stats is not None:
+            self.stats.heuristic()
+        if self.base is not None:
+            i = node - self.base
+            if 0 <= i < len(self.values):
+                return self.values[i]
+            return float('inf')
+        i = self.index.get(node)
+        return self.values[i] if i is not None else float('inf')
+
+def _numpy_distances(node_ids, goal_points, node_positions, block_size=1 << 20):
+    """
+    Minimum Euclidean distance from every node to the goal points, vectorized.
+    The squared distances are computed as (x2 - x1)**2 + (y2 - y1)**2 in float64, like
+    calculate_heuristic, so the results are bit-for-bit the same for integer coordinates.
+    With float coordinates Python's ** may round differently in the last bit.
+    Work is split into blocks of about block_size node-goal pairs to bound memory.
+    """
+    np = _import_numpy()
+    coords = np.array([node_positions[node] for node in node_ids], dtype=np.float64).reshape(-1, 2)
+    goals = np.array(goal_points, dtype=np.float64)
+    best = np.full(len(node_ids), np.inf)
+    rows = max(1, block_size // len(goals))
+    for start in range(0, len(node_ids), rows):
+        block = coords[start:start + rows]
+        dx = goals[:, 0][None, :] - block[:, 0][:, None]
+        dy = goals[:, 1][None, :] - block[:, 1][:, None]
+        best[start:start + rows] = (dx * dx + dy * dy).min(axis=1)
+    return np.sqrt(best).tolist()
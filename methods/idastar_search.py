@@ -0,0 +1,171 @@
+import sys
+import math
+from graph import Graph
+from input_parser import build_data
+from methods.heuristic import EuclideanHeuristic
+from methods.search_state import SearchLimitReached
+
+# Default cap on generated nodes (over all iterations) before IDA* gives up
+MAX_GENERATED = 1_000_000
+
+# Default minimum factor by which the bound grows per iteration
+BOUND_GROWTH = 1.1
+
+def idastar(origin, destinations, edges, node_positions, stats=None, max_generated=MAX_GENERATED,
+            bound_growth=BOUND_GROWTH):
+    """
+    Iterative Deepening A* (IDA*) implementation.
+    - Repeats a depth-first search bounded by f = g + h, raising the bound each
+      iteration to the smallest f value that exceeded it, and at least by bound_growth
+    - A goal found under a bound that grew past the optimum is not returned at once:
+      the rest of that iteration only looks for cheaper goals (branch and bound), so
+      the path returned is cost-optimal whenever A*'s is
+    - Within an iteration a node reached again with no lower g than before is pruned,
+      which stops the re-expansion of the same subtrees through different paths
+    - Uses the Euclidean heuristic of A*; a node without coordinates gets h = 0
+    - Non-recursive, so long paths cannot overflow the Python call stack
+    - Expands neighbors in ascending order of node ID
+    - Memory: the current path plus, per iteration, the best g of every node reached and
+      the sorted neighbors of every node expanded; no open list or priority queue
+    - Without any of these, real-valued costs raise the bound by tiny steps and every
+      simple path is walked again each time, which does not finish in practice. The
+      search still stops after max_generated nodes and raises SearchLimitReached, which
+      means "no answer", not "no path"
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        node_positions: Dictionary mapping node IDs to (x,y) coordinates
+        stats: Optional SearchStats that records expansions, stack pushes and pops and heuristic calls
+        max_generated: Number of generated nodes after which the search gives up (None for no limit)
+        bound_growth: Minimum factor by which the bound grows per iteration (at least 1). Larger
+                      factors mean fewer iterations but more work in the last one
+        
+    Returns:
+        tuple: (goal_reached, nodes_generated, path)
+            - goal_reached: The ID of the destination node that was reached
+            - nodes_generated: Number of nodes generated during search (over all iterations)
+            - path: List of node IDs representing the path from origin to goal
+            When no destination is reachable, goal_reached is None and path is empty.
+    
+    Raises:
+        SearchLimitReached: If max_generated nodes were generated without an answer
+    """
+    goal_set = set(destinations)
+    nodes_generated = 1  # Count the origin node
+    
+    if origin in goal_set:
+        return origin, nodes_generated, [origin]
+    
+    # Not memoized: a cache would grow with the graph instead of the path
+    euclidean = EuclideanHeuristic(destinations, node_positions, memoize=False, stats=stats)
+    
+    def heuristic(node):
+        # A node without coordinates has no estimate rather than no path
+        h = euclidean(node)
+        return h if h != math.inf else 0
+    
+    # Sorted once per node and reused by every iteration (as in iddfs_search)
+    neighbor_cache = {}
+    
+    def sorted_neighbors(node):
+        neighbors = neighbor_cache.get(node)
+        if neighbors is None:
+            neighbors = sorted(edges.get(node, []), key=lambda t: t[0])
+            neighbor_cache[node] = neighbors
+        return neighbors
+    
+    bound = heuristic(origin)
+    
+    while bound != math.inf:
+        next_bound = math.inf  # Smallest f value that exceeded the bound
+        limit = bound          # Highest f still explored; drops below the best goal once one is found
+        best = None            # (goal, path) of the cheapest goal found in this iteration
+        best_g = {origin: 0}   # Lowest g of every node reached in this iteration
+        path = [origin]
+        on_path = {origin}
+        # One entry per node on the path: (iterator over its sorted neighbors, g of the node)
+        stack = [(iter(sorted_neighbors(origin)), 0)]
+        if stats is not None:
+            stats.push(1)
+            stats.expand()
+        
+        while stack:
+            neighbors, g_score = stack[-1]
+            for neighbor, cost in neighbors:
+                if neighbor in on_path:
+                    continue
+                nodes_generated += 1
+                if max_generated is not None and nodes_generated > max_generated:
+                    raise SearchLimitReached(nodes_generated, max_generated)
+                
+                tentative_g_score = g_score + cost
+                # Reached before in this iteration at no higher cost: its subtree was searched
+                if best_g.get(neighbor, math.inf) <= tentative_g_score:
+                    continue
+                f_score = tentative_g_score + heuristic(neighbor)
+                if f_score > limit:
+                    next_bound = min(next_bound, f_score)
+                    continue
+                best_g[neighbor] = tentative_g_score
+                
+                if neighbor in goal_set:
+                    # Keep searching this iteration, but only for strictly cheaper goals
+                    best = (neighbor, path + [neighbor])
+                    limit = math.nextafter(tentative_g_score, -math.inf)
+                    continue
+                
+                # Go deeper; this node's iterator resumes when the neighbor is exhausted
+                path.append(neighbor)
+                on_path.add(neighbor)
+                stack.append((iter(sorted_neighbors(neighbor)), tentative_g_score))
+                if stats is not None:
+                    stats.push(len(stack))
+                    stats.expand()
+                break
+            else:
+                stack.pop()
+                if stats is not None:
+                    stats.pop()
+                on_path.discard(path.pop())
+        
+        if best is not None:
+            return best[0], nodes_generated, best[1]
+        
+        # Raise the bound at least by bound_growth, so real-valued costs cannot creep up
+        bound = max(next_bound, bound * bound_growth) if next_bound != math.inf else next_bound
+    
+    # Every node reachable from the origin was searched: no path
+    return None, nodes_generated, []
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python idastar_search.py <filename>")
+        return
+
+    filename = sys.argv[1]
+    
+    # Use the common input parser
+    node_pos, edges, origin, destinations = build_data(filename)
+
+    # Create graph instance
+    graph = Graph(node_pos, edges)
+    
+    # Run IDA* Search
+    print(f"{filename} IDA")
+    try:
+        goal, count, path = idastar(origin, destinations, edges, node_pos)
+    except SearchLimitReached as e:
+        print(f"Gave up: {e}")
+        return
+
+    # Output in required format
+    if path:
+        print(f"{goal} {count}")
+        print(" -> ".join(map(str, path)))
+    else:
+        print("No path found")
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,147 @@
 import sys
-from collections import deque
 from graph import Graph
 from input_parser import build_data
+from methods.search_state import reconstruct_path
 
 # -----------------------------------------------------------------------------
-# reconstruct_path:
+# sorted_neighbors:
 # -----------------------------------------------------------------------------
-def reconstruct_path(came_from, goal):
+def sorted_neighbors(edges, neighbor_cache, node):
     """
-    Reconstructs the path from the origin to the goal using the came_from dictionary.
+    Returns the neighbor IDs of a node in ascending order, sorting each node's
+    adjacency list only once and reusing it across all depth limits.
     
     Args:
-        came_from: Dictionary mapping each node to its predecessor in the search.
-        goal: The goal node where the search ended.
+        edges: Dictionary mapping nodes to lists of (neighbor, cost) tuples.
+        neighbor_cache: Dictionary mapping nodes to their already sorted neighbor IDs.
+        node: The node whose neighbors are needed.
         
     Returns:
-        List of node IDs representing the path from origin to goal.
+        Tuple of neighbor node IDs in ascending order.
     """
-    path = [goal]
-    while goal in came_from:
-        goal = came_from[goal]
-        path.append(goal)
-    return path[::-1]  # Reverse the path to start at the origin
+    neighbors = neighbor_cache.get(node)
+    if neighbors is None:
+        neighbors = tuple(neighbor for neighbor, _ in sorted(edges.get(node, []), key=lambda t: t[0]))
+        neighbor_cache[node] = neighbors
+    return neighbors
 
 # -----------------------------------------------------------------------------
-# depth_limited_search:
+# limited_search:
 # -----------------------------------------------------------------------------
-def depth_limited_search(current, destinations, edges, limit, visited, came_from, nodes_generated):
+def limited_search(current, destinations, edges, limit, visited, came_from, nodes_generated, neighbor_cache,
+                   stats=None):
     """
-    Performs a recursive depth-first search up to a fixed depth limit.
+    Performs a depth-first search up to a fixed depth limit, using an explicit
+    stack instead of recursion so that very deep limits cannot overflow the
+    Python call stack. Nodes are generated in exactly the order of the
+    recursive formulation (see depth_limited_search).
     
     Args:
-        current: The current node being explored.
-        destinations: List of destination node IDs.
+        current: The node the search starts from.
+        destinations: Collection of destination node IDs.
         edges: Dictionary mapping nodes to lists of (neighbor, cost) tuples.
-        limit: The remaining depth limit for the search.
+        limit: The depth limit for the search.
         visited: Set of nodes already visited in this iteration.
         came_from: Dictionary storing the predecessor of each visited node.
         nodes_generated: Counter for the number of nodes generated.
+        neighbor_cache: Dictionary of sorted neighbor IDs (see sorted_neighbors).
+        stats: Optional SearchStats that records expansions and stack pushes and pops.
         
     Returns:
-        A tuple (goal_reached, nodes_generated, came_from)
+        A tuple (goal_reached, nodes_generated, cutoff)
             - goal_reached: The destination node if found; otherwise, None.
             - nodes_generated: Updated count of generated nodes.
-            - came_from: The updated predecessor dictionary.
+            - cutoff: True if the depth limit stopped the search from reaching an
+              unvisited node, i.e. a deeper limit could explore more of the graph.
     """
-    # Check if current node is a destination
     if current in destinations:
-        return current, nodes_generated, came_from
+        return current, nodes_generated, False
     
-    # If depth limit is reached, stop recursion
+    cutoff = False
     if limit == 0:
-        return None, nodes_generated, came_from
-
-    # Sort neighbors in ascending order for consistent node expansion
-    neighbors = sorted(edges.get(current, []), key=lambda t: t[0])
+        cutoff = any(neighbor not in visited for neighbor in sorted_neighbors(edges, neighbor_cache, current))
+        return None, nodes_generated, cutoff
     
-    for neighbor, _ in neighbors:
-        if neighbor not in visited:
+    # Each stack entry is (node, iterator over its remaining neighbors, remaining depth)
+    stack = [(current, iter(sorted_neighbors(edges, neighbor_cache, current)), limit)]
+    if stats is not None:
+        stats.push(1)
+        stats.expand()
+    while stack:
+        node, neighbors, depth = stack[-1]
+        for neighbor in neighbors:
+            if neighbor in visited:
+                continue
             visited.add(neighbor)
-            came_from[neighbor] = current
+            came_from[neighbor] = node
             nodes_generated += 1
             
-            # Recurse with reduced depth limit
-            result, nodes_generated, came_from = depth_limited_search(
-                neighbor, destinations, edges, limit - 1, visited, came_from, nodes_generated)
-                
-            # If a destination was found, propagate it back up
-            if result is not None:
-                return result, nodes_generated, came_from
-                
-    return None, nodes_generated, came_from
+            if neighbor in destinations:
+                return neighbor, nodes_generated, cutoff
+            
+            child_neighbors = sorted_neighbors(edges, neighbor_cache, neighbor)
+            if depth == 1:
+                # The limit stops here; remember whether it hid anything new
+                if not cutoff:
+                    cutoff = any(n not in visited for n in child_neighbors)
+                continue
+            
+            # Descend into the neighbor; this node's iterator resumes afterwards
+            stack.append((neighbor, iter(child_neighbors), depth - 1))
+            if stats is not None:
+                stats.push(len(stack))
+                stats.expand()
+            break
+        else:
+            stack.pop()
+            if stats is not None:
+                stats.pop()
+    
+    return None, nodes_generated, cutoff
+
+# -----------------------------------------------------------------------------
+# depth_limited_search:
+# -----------------------------------------------------------------------------
+def depth_limited_search(current, destinations, edges, limit, visited, came_from, nodes_generated):
+    """
+    Performs a depth-first search up to a fixed depth limit.
+    
+    Args:
+        current: The current node being explored.
+        destinations: List of destination node IDs.
+        edges: Dictionary mapping nodes to lists of (neighbor, cost) tuples.
+        limit: The remaining depth limit for the search.
+        visited: Set of nodes already visited in this iteration.
+        came_from: Dictionary storing the predecessor of each visited node.
+        nodes_generated: Counter for the number of nodes generated.
+        
+    Returns:
+        A tuple (goal_reached, nodes_generated, came_from)
+            - goal_reached: The destination node if found; otherwise, None.
+            - nodes_generated: Updated count of generated nodes.
+            - came_from: The updated predecessor dictionary.
+    """
+    result, nodes_generated, _ = limited_search(
+        current, destinations, edges, limit, visited, came_from, nodes_generated, {})
+    return result, nodes_generated, came_from
 
 # -----------------------------------------------------------------------------
 # iddfs:
 # -----------------------------------------------------------------------------
-def iddfs(origin, destinations, edges, max_depth=50):
+def iddfs(origin, destinations, edges, max_depth=50, stats=None):
     """
     Iterative Deepening Depth-First Search (IDDFS) implementation.
     - Uses depth-limited search with increasing depth limits
     - Guarantees the shortest path in unweighted graphs
     - Memory-efficient compared to BFS
+    - Non-recursive, so max_depth can be in the thousands
     
     Args:
         origin: The starting node ID
         destinations: List of destination node IDs
         edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
         max_depth: Maximum depth to search before giving up (default: 50)
+        stats: Optional SearchStats; iterations that are counted without being run add nothing to it
         
     Returns:
         tuple: (goal_reached, nodes_generated, path)
@@ -95,19 +150,27 @@ def iddfs(origin, destinations, edges, max_depth=50):
             - path: List of node IDs representing the path from origin to goal
     """
     total_nodes_generated = 1  # Count the origin node
+    goal_set = set(destinations)
+    neighbor_cache = {}  # Sorted neighbors, shared by every iteration
     
     # Try increasing depth limits from 0 to max_depth
     for depth_limit in range(max_depth + 1):
         visited = set([origin])
         came_from = {}
         
-        result, nodes_generated, came_from = depth_limited_search(
-            origin, destinations, edges, depth_limit, visited, came_from, 0)
+        result, nodes_generated, cutoff = limited_search(
+            origin, goal_set, edges, depth_limit, visited, came_from, 0, neighbor_cache, stats)
             
         total_nodes_generated += nodes_generated
         
         if result is not None:
             return result, total_nodes_generated, reconstruct_path(came_from, result)
+        
+        if not cutoff:
+            # The whole reachable set was explored without hitting the limit, so every
+            # deeper iteration would repeat this one exactly. Count them without running them.
+            total_nodes_generated += nodes_generated * (max_depth - depth_limit)
+            break
     
     # No path found within max_depth
     return None, total_nodes_generated, []
@@ -0,0 +1,231 @@
+# landmarks.py
+# ALT (A*, Landmarks, Triangle inequality) heuristics.
+# A few landmark nodes are chosen once per graph and the exact shortest-path
+# distances to and from each of them are stored for every node. For any nodes
+# v and t and landmark L, the triangle inequality gives two lower bounds:
+#     d(v, t) >= d(L, t) - d(L, v)      and      d(v, t) >= d(v, L) - d(t, L)
+# Unlike the Euclidean heuristic these bounds follow the actual edge costs, so
+# they stay tight when costs are travel times or tolls rather than distances.
+# The bound is consistent, so A* keeps returning optimal paths with it.
+
+import struct
+from array import array
+from graph import build_reverse_edges
+from methods.ucs_search import shortest_path_tree
+
+LANDMARK_MAGIC = b"RGALT\x00\x00\x01"
+
+# magic, number of nodes, number of landmarks
+LANDMARK_HEADER = struct.Struct("<8sqq")
+
+INF = float('inf')
+
+class LandmarkIndex:
+    """
+    Distances between every node and K landmarks, stored compactly.
+
+    Node i (in sorted node ID order) owns the K values at positions i*K .. i*K + K - 1
+    of the flat from_landmarks (d(L, node)) and to_landmarks (d(node, L)) arrays.
+    Unreachable pairs are stored as infinity.
+    """
+
+    def __init__(self, node_ids, landmarks, from_landmarks, to_landmarks):
+        self.node_ids = node_ids
+        self.landmarks = landmarks
+        self.from_landmarks = from_landmarks
+        self.to_landmarks = to_landmarks
+        self.index = {node: i for i, node in enumerate(node_ids)}
+
+    @classmethod
+    def build(cls, edges, num_landmarks=8, nodes=(), reverse_edges=None):
+        """
+        Chooses landmarks by farthest selection and computes their distance arrays.
+
+        The first landmark is the node farthest from the smallest node ID; every next one
+        is the node whose distance to the closest landmark already chosen is the largest.
+        Each landmark costs one forward and one backward Dijkstra search.
+
+        Args:
+            edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+            num_landmarks: Number of landmarks K
+            nodes: Optional iterable of node IDs without edges that should still be indexed
+            reverse_edges: Optional incoming-edge index (see Graph.reverse_edges)
+
+        Returns:
+            LandmarkIndex: The index
+        """
+        if reverse_edges is None:
+            reverse_edges = build_reverse_edges(edges)
+
+        ids = set(nodes)
+        ids.update(edges)
+        for adjacency in edges.values():
+            ids.update(dest for dest, _ in adjacency)
+        node_ids = array("q", sorted(ids))
+
+        landmarks = []
+        from_rows = []  # per landmark: node -> d(L, node)
+        to_rows = []    # per landmark: node -> d(node, L)
+        # Distance from each node to the chosen landmarks (in either direction), used for selection
+        closest = {}
+        start = node_ids[0] if node_ids else None
+        candidates = shortest_path_tree(start, edges).distances if start is not None else {}
+
+        while len(landmarks) < min(num_landmarks, len(node_ids)):
+            # Farthest reachable node not already chosen; smallest ID on ties
+            best = None
+            for node, distance in candidates.items():
+                if node in landmarks or distance == INF:
+                    continue
+                if best is None or distance > candidates[best] or (distance == candidates[best] and node < best):
+                    best = node
+            if best is None:
+                # Everything reachable is covered: start on another component
+                best = next((node for node in node_ids if node not in closest and node not in landmarks), None)
+                if best is None:
+                    break
+
+            landmarks.append(best)
+            from_rows.append(shortest_path_tree(best, edges).distances)
+            to_rows.append(shortest_path_tree(best, reverse_edges).distances)
+            for row in (from_rows[-1], to_rows[-1]):
+                for node, distance in row.items():
+                    if distance < closest.get(node, INF):
+                        closest[node] = distance
+            candidates = closest
+
+        k = len(landmarks)
+        from_landmarks = array("d", bytes(8 * k * len(node_ids)))
+        to_landmarks = array("d", bytes(8 * k * len(node_ids)))
+        for i, node in enumerate(node_ids):
+            for l in range(k):
+                from_landmarks[i * k + l] = from_rows[l].get(node, INF)
+                to_landmarks[i * k + l] = to_rows[l].get(node, INF)
+        return cls(node_ids, landmarks, from_landmarks, to_landmarks)
+
+    @property
+    def num_landmarks(self):
+        return len(self.landmarks)
+
+    def rows(self, node):
+        """
+        Returns (from_landmarks, to_landmarks) slices of node, or None if the node is unknown.
+        """
+        i = self.index.get(node)
+        if i is None:
+            return None
+        k = len(self.landmarks)
+        return self.from_landmarks[i * k:(i + 1) * k], self.to_landmarks[i * k:(i + 1) * k]
+
+    def lower_bound(self, u, v):
+        """
+        Returns the best triangle-inequality lower bound on the path cost from u to v
+        (0 when nothing is known, infinity when v is provably unreachable from u).
+        """
+        u_rows, v_rows = self.rows(u), self.rows(v)
+        if u_rows is None or v_rows is None:
+            return 0
+        return _bound(u_rows, v_rows)
+
+    def heuristic(self, goal_nodes, memoize=True, stats=None):
+        """
+        Returns a LandmarkHeuristic estimating the cost from a node to the closest goal.
+        """
+        return LandmarkHeuristic(self, goal_nodes, True, memoize, stats)
+
+    def backward_heuristic(self, source_nodes, memoize=True, stats=None):
+        """
+        Returns a LandmarkHeuristic estimating the cost from the closest source to a node,
+        for searches that run backward from the goals.
+        """
+        return LandmarkHeuristic(self, source_nodes, False, memoize, stats)
+
+    def save(self, filename):
+        """
+        Writes the index to a binary file (see load).
+        """
+        with open(filename, "wb") as file:
+            file.write(LANDMARK_HEADER.pack(LANDMARK_MAGIC, len(self.node_ids), len(self.landmarks)))
+            self.node_ids.tofile(file)
+            array("q", self.landmarks).tofile(file)
+            self.from_landmarks.tofile(file)
+            self.to_landmarks.tofile(file)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads an index written by save.
+
+        Raises:
+            ValueError: If the file is not a landmark index
+        """
+        with open(filename, "rb") as file:
+            magic, num_nodes, num_landmarks = LANDMARK_HEADER.unpack(file.read(LANDMARK_HEADER.size))
+            if magic != LANDMARK_MAGIC:
+                raise ValueError(f"{filename} is not a landmark index file")
+            values = []
+            for typecode, count in (("q", num_nodes), ("q", num_landmarks),
+                                    ("d", num_nodes * num_landmarks), ("d", num_nodes * num_landmarks)):
+                data = array(typecode)
+                data.fromfile(file, count)
+                values.append(data)
+        node_ids, landmarks, from_landmarks, to_landmarks = values
+        return cls(node_ids, list(landmarks), from_landmarks, to_landmarks)
+
+def _bound(u_rows, v_rows):
+    # max over landmarks of d(L, v) - d(L, u) and d(u, L) - d(v, L).
+    # inf - inf is nan and never wins a comparison, so unknown pairs are skipped.
+    from_u, to_u = u_rows
+    from_v, to_v = v_rows
+    best = 0
+    for fu, fv in zip(from_u, from_v):
+        bound = fv - fu
+        if bound > best:
+            best = bound
+    for tu, tv in zip(to_u, to_v):
+        bound = tu - tv
+        if bound > best:
+            best = bound
+    return best
+
+class LandmarkHeuristic:
+    """
+    Triangle-inequality lower bound to (or from) the closest of a set of nodes.
+    Called with a node ID, like EuclideanHeuristic, so it can be passed as the
+    heuristic of astar or bdwa.
+    """
+
+    def __init__(self, index, targets, forward=True, memoize=True, stats=None):
+        """
+        Args:
+            index: A LandmarkIndex of the graph being searched
+            targets: Node IDs the estimate is measured to (forward) or from (backward)
+            forward: True to bound d(node, target), False to bound d(target, node)
+            memoize: Whether to remember the value of every node asked about
+            stats: Optional SearchStats that counts the calls
+        """
+        self.index = index
+        self.forward = forward
+        self.target_rows = [rows for rows in map(index.rows, targets) if rows is not None]
+        self.known_targets = len(self.target_rows) == len(targets)
+        self.cache = {} if memoize else None
+        self.stats = stats
+
+    def __call__(self, node):
+        if self.stats is not None:
+            self.stats.heuristic()
+        if self.cache is None:
+            return self._compute(node)
+        value = self.cache.get(node)
+        if value is None:
+            value = self._compute(node)
+            self.cache[node] = value
+        return value
+
+    def _compute(self, node):
+        rows = self.index.rows(node)
+        if rows is None or not self.known_targets:
+            return 0
+        if self.forward:
+            return min((_bound(rows, target) for target in self.target_rows), default=INF)
+        return min((_bound(target, rows) for target in self.target_rows), default=INF)
@@ -0,0 +1,118 @@
+import sys
+from graph import Graph
+from input_parser import build_data
+from methods.heuristic import EuclideanHeuristic
+from methods.search_state import reconstruct_path
+from methods.frontier import PriorityFrontier
+
+# Above this many routes A* mode runs as Dijkstra: once the goals are spread over the
+# graph A* expands about as many nodes, and rebuilding the heuristic after every goal
+# reached costs more than it saves
+ASTAR_MAX_ROUTES = 16
+
+def all_routes(origin, destinations, edges, node_positions=None, k=None, heuristic_for=None, stats=None):
+    """
+    Finds lowest-cost routes from the origin to every destination (or the k nearest) in one search.
+    - Without node positions it is Dijkstra's algorithm, expanding until the goals are settled
+    - With node positions it is A* towards the closest remaining goal: each time a goal is
+      reached it leaves the goal set and the heuristic is rebuilt for the goals left.
+      Frontier keys then only grow, so they are re-keyed lazily: a node whose key is below
+      g + h when it is popped goes back with the new key. Expanded nodes keep their costs,
+      since the heuristic stays consistent
+    - When more than ASTAR_MAX_ROUTES routes are wanted the heuristic is not used
+    - Ties are broken by ascending node ID, then by insertion order
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        node_positions: Optional dictionary mapping node IDs to (x,y) coordinates; enables A*
+        k: Optional number of nearest destinations to return (default: all of them)
+        heuristic_for: Optional callable taking a list of goals and returning a heuristic for them
+                       (e.g. LandmarkIndex.heuristic). Defaults to the Euclidean heuristic
+                       when node_positions is given.
+        stats: Optional SearchStats that records expansions and frontier activity
+    
+    Returns:
+        tuple: (routes, nodes_generated)
+            - routes: List of (goal, cost, path) tuples ranked by cost; destinations that
+                      cannot be reached are left out
+            - nodes_generated: Number of nodes expanded during the search
+    """
+    goals = list(dict.fromkeys(destinations))
+    remaining = set(goals)
+    wanted = len(goals) if k is None else min(k, len(goals))
+    if wanted > ASTAR_MAX_ROUTES:
+        heuristic_for = None
+    elif heuristic_for is None and node_positions is not None:
+        heuristic_for = lambda goals: EuclideanHeuristic(goals, node_positions, stats=stats)
+
+    heuristic = heuristic_for(goals) if heuristic_for is not None and goals else None
+    frontier = PriorityFrontier(stats)
+    frontier.push(origin, heuristic(origin) if heuristic is not None else 0)  # node, f_score
+    g_scores = {origin: 0}
+    closed_set = set()
+    # Parents are recorded when a cheaper path is found, since with a stale key the
+    # frontier may keep the old entry; a node's parent is final once it is expanded
+    came_from = {}
+    routes = []
+    nodes_generated = 0
+
+    while frontier and len(routes) < wanted:
+        current, f_score, _ = frontier.pop()
+        g_score = g_scores[current]
+        if heuristic is not None:
+            # Keys are lower bounds on g + h: re-key a stale one instead of expanding it
+            current_f_score = g_score + heuristic(current)
+            if current_f_score > f_score:
+                frontier.push(current, current_f_score)
+                continue
+        closed_set.add(current)
+        nodes_generated += 1
+        if stats is not None:
+            stats.expand()
+
+        if current in remaining:
+            routes.append((current, g_score, reconstruct_path(came_from, current)))
+            remaining.discard(current)
+            if heuristic is not None and remaining and len(routes) < wanted:
+                # Steer towards the goals that are left
+                heuristic = heuristic_for([goal for goal in goals if goal in remaining])
+
+        for neighbor, edge_cost in edges.get(current, []):
+            if neighbor in closed_set:
+                continue
+            tentative_g_score = g_score + edge_cost
+            if neighbor not in g_scores or tentative_g_score < g_scores[neighbor]:
+                g_scores[neighbor] = tentative_g_score
+                came_from[neighbor] = current
+                h_score = heuristic(neighbor) if heuristic is not None else 0
+                frontier.push(neighbor, tentative_g_score + h_score)
+
+    return routes, nodes_generated
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python routes_search.py <filename> [k]")
+        return
+
+    filename = sys.argv[1]
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else None
+
+    # Use the common input parser
+    node_pos, edges, origin, destinations = build_data(filename)
+
+    # Create graph instance
+    graph = Graph(node_pos, edges)
+
+    # Find routes to all (or the k nearest) destinations in one search
+    routes, count = all_routes(origin, destinations, edges, k=k)
+
+    # One line per route, nearest first
+    print(f"{filename} ROUTES")
+    print(f"{len(routes)} {count}")
+    for goal, cost, path in routes:
+        print(f"{goal} {cost}: " + " -> ".join(map(str, path)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# search_state.py
+# Shared parent-pointer bookkeeping for the search methods.
+# Instead of copying the whole path into every frontier entry, a search records
+# the predecessor of each node it reaches in a came_from dictionary and rebuilds
+# the path once, when a goal is found. SearchLimitReached is raised by searches
+# that give up before they can tell whether a path exists.
+
+class SearchLimitReached(RuntimeError):
+    """
+    Raised when a search stops at its node limit without finding a path or proving
+    there is none. It is not a "No path found" result: a path may well exist.
+    """
+
+    def __init__(self, nodes_generated, limit):
+        super().__init__(nodes_generated, limit)
+        self.nodes_generated = nodes_generated
+        self.limit = limit
+
+    def __str__(self):
+        return f"search stopped after generating {self.nodes_generated} nodes (limit {self.limit}) without a result"
+
+# -----------------------------------------------------------------------------
+# reconstruct_path:
+# -----------------------------------------------------------------------------
+def reconstruct_path(came_from, goal):
+    """
+    Reconstructs the path from the origin to the goal using the came_from dictionary.
+    
+    Args:
+        came_from: Dictionary mapping each node to its predecessor in the search.
+                   The origin itself must not have an entry.
+        goal: The goal node where the search ended.
+        
+    Returns:
+        List of node IDs representing the path from origin to goal.
+    """
+    path = [goal]
+    while goal in came_from:
+        goal = came_from[goal]
+        path.append(goal)
+    return path[::-1]  # Reverse the path to start at the origin
@@ -0,0 +1,122 @@
+# search_stats.py
+# Optional instrumentation shared by the search methods.
+# Every search accepts stats=None; when a SearchStats object is passed, the
+# search records what it does into it (expansions, frontier pushes and pops,
+# stale entries skipped, peak frontier size, heuristic calls) and the caller
+# can time named phases and measure peak memory. With stats=None the searches
+# only pay for a None check, so production queries are unaffected.
+
+import time
+from contextlib import contextmanager
+
+class SearchStats:
+    """
+    Counters and timings collected while a search runs.
+
+    Attributes:
+        expansions: Nodes taken off the frontier and expanded
+        pushes: Entries added to the frontier (including the start nodes)
+        pops: Live entries taken off the frontier
+        stale_pops: Outdated frontier entries skipped (replaced or already expanded nodes)
+        peak_frontier: Largest number of entries held by the frontier at once
+        heuristic_calls: Number of heuristic evaluations requested by the search
+        phases: Dictionary mapping phase names to wall time in seconds (see phase)
+        peak_memory: Largest traced allocation in bytes during a phase, when track_memory is on
+    """
+
+    def __init__(self, track_memory=False):
+        """
+        Args:
+            track_memory: Whether phases measure peak memory with tracemalloc (slows the search down)
+        """
+        self.expansions = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_frontier = 0
+        self.heuristic_calls = 0
+        self.phases = {}
+        self._open_phases = []  # Time spent in nested phases, one entry per phase being timed
+        self.track_memory = track_memory
+        self.peak_memory = None
+
+    def push(self, frontier_size):
+        """
+        Records a frontier push; frontier_size is the size after the push.
+        """
+        self.pushes += 1
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+
+    def pop(self):
+        self.pops += 1
+
+    def stale(self):
+        self.stale_pops += 1
+
+    def expand(self):
+        self.expansions += 1
+
+    def heuristic(self):
+        self.heuristic_calls += 1
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times a block of code under a phase name (times of repeated phases add up).
+        A phase opened inside another one is left out of the outer phase's time, so
+        phase times never overlap (e.g. a "preprocess" run within "search").
+        With track_memory, the peak traced memory of the block is recorded as well.
+        """
+        started_tracing = False
+        if self.track_memory:
+            # Imported here: it is slow to import and only --trace-memory needs it
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        self._open_phases.append(0.0)
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._open_phases.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - nested
+            if self._open_phases:
+                self._open_phases[-1] += elapsed
+            if self.track_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory = max(self.peak_memory or 0, peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def as_dict(self):
+        return {
+            "expansions": self.expansions,
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stale_pops": self.stale_pops,
+            "peak_frontier": self.peak_frontier,
+            "heuristic_calls": self.heuristic_calls,
+            "peak_memory": self.peak_memory,
+            "phases": dict(self.phases),
+        }
+
+    def to_json(self):
+        import json
+        return json.dumps(self.as_dict())
+
+    def report(self):
+        """
+        Returns the statistics as "# "-prefixed comment lines, in the style of the search output.
+        """
+        lines = ["# Search statistics:"]
+        for name, value in self.as_dict().items():
+            if name == "phases":
+                for phase, seconds in value.items():
+                    lines.append(f"#   time {phase + ':':<15} {seconds * 1000:.3f} ms")
+            elif value is not None:
+                lines.append(f"#   {name + ':':<20} {value}")
+        return "\n".join(lines)
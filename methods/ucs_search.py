@@ -0,0 +1,193 @@
+import sys
+from collections import OrderedDict
+from graph import Graph, CSRAdjacency
+from input_parser import build_data
+from methods.search_state import reconstruct_path
+from methods.frontier import PriorityFrontier
+
+def ucs(origin, destinations, edges, stats=None):
+    """
+    Uniform-Cost Search (Dijkstra's algorithm) implementation.
+    - Always expands the frontier node with the lowest path cost g(n)
+    - Returns a lowest-cost path to the closest destination
+    - Breaks ties by ascending node ID, then by insertion order
+    
+    Args:
+        origin: The starting node ID
+        destinations: List of destination node IDs
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        stats: Optional SearchStats that records expansions and frontier activity
+        
+    Returns:
+        tuple: (goal_reached, nodes_generated, path)
+            - goal_reached: The ID of the destination node that was reached
+            - nodes_generated: Number of nodes expanded during search
+            - path: List of node IDs representing the path from origin to goal
+    """
+    goal_set = set(destinations)
+    tree = shortest_path_tree(origin, edges, goal_set, stats)
+    return tree.route(destinations)
+
+def shortest_path_tree(origin, edges, stop_at=None, stats=None):
+    """
+    Runs Dijkstra's algorithm from origin and records the shortest-path tree.
+    
+    Args:
+        origin: The starting node ID
+        edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+        stop_at: Optional set of nodes; the search stops as soon as one of them is expanded.
+                 When omitted, every node reachable from origin is expanded.
+        stats: Optional SearchStats that records expansions and frontier activity
+        
+    Returns:
+        ShortestPathTree: The (possibly partial) tree of expanded nodes
+    """
+    frontier = PriorityFrontier(stats)
+    frontier.push(origin, 0, None)  # node, g_score, parent
+    distances = {}   # Final cost of every expanded node
+    came_from = {}
+    order = {}       # Expansion rank of every expanded node (0 for the origin)
+    # Compiled graphs keep their edges in CSR arrays, read directly without building tuples
+    csr = edges if isinstance(edges, CSRAdjacency) else None
+    
+    while frontier:
+        current, g_score, parent = frontier.pop()
+        distances[current] = g_score
+        order[current] = len(order)
+        if stats is not None:
+            stats.expand()
+        if parent is not None:
+            came_from[current] = parent
+        
+        if stop_at is not None and current in stop_at:
+            break
+        
+        if csr is not None:
+            start, end = csr.edge_range(current)
+            neighbors = zip(csr.targets[start:end], csr.costs[start:end])
+        else:
+            neighbors = edges.get(current, ())
+        for neighbor, edge_cost in neighbors:
+            if neighbor not in distances:
+                # Only kept if cheaper than the neighbor's current frontier entry
+                frontier.push(neighbor, g_score + edge_cost, current)
+    
+    return ShortestPathTree(origin, distances, came_from, order)
+
+class ShortestPathTree:
+    """
+    Shortest-path tree rooted at an origin, as produced by shortest_path_tree.
+    A complete tree answers queries to any destination set without searching again.
+    """
+    
+    def __init__(self, origin, distances, came_from, order):
+        self.origin = origin
+        self.distances = distances  # node -> lowest path cost from origin
+        self.came_from = came_from  # node -> predecessor on that path
+        self.order = order          # node -> expansion rank
+    
+    def path_to(self, node):
+        """
+        Returns the lowest-cost path from the origin to node, or [] if node is not in the tree.
+        """
+        if node not in self.distances:
+            return []
+        return reconstruct_path(self.came_from, node)
+    
+    def nearest(self, destinations):
+        """
+        Returns the destination with the lowest path cost, or None if none is reachable.
+        Equal costs are resolved like ucs: the destination it would have expanded first.
+        """
+        reachable = [goal for goal in destinations if goal in self.order]
+        if not reachable:
+            return None
+        return min(reachable, key=lambda goal: self.order[goal])
+    
+    def route(self, destinations):
+        """
+        Answers a query with the same result ucs would return.
+        
+        Returns:
+            tuple: (goal_reached, nodes_generated, path), where nodes_generated is the number
+                   of nodes ucs would have expanded to reach that goal
+        """
+        goal = self.nearest(destinations)
+        if goal is None:
+            return None, len(self.order), []
+        return goal, self.order[goal] + 1, self.path_to(goal)
+
+class ShortestPathTreeCache:
+    """
+    Least-recently-used cache of complete shortest-path trees, keyed by origin.
+    The first query from an origin builds its whole tree; later queries from the same
+    origin, to any destination set, are answered from the tree without searching.
+    """
+    
+    def __init__(self, edges, maxsize=128):
+        """
+        Args:
+            edges: Dictionary mapping source node IDs to lists of (destination, cost) tuples
+            maxsize: Maximum number of trees kept in memory
+        """
+        self.edges = edges
+        self.maxsize = maxsize
+        self.trees = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def tree(self, origin):
+        """
+        Returns the complete shortest-path tree of origin, building it on a miss.
+        """
+        tree = self.trees.get(origin)
+        if tree is not None:
+            self.hits += 1
+            self.trees.move_to_end(origin)
+            return tree
+        
+        self.misses += 1
+        tree = shortest_path_tree(origin, self.edges)
+        self.trees[origin] = tree
+        if len(self.trees) > self.maxsize:
+            self.trees.popitem(last=False)  # Evict the least recently used tree
+        return tree
+    
+    def route(self, origin, destinations):
+        """
+        Answers a query from the cached tree of origin; same result as ucs.
+        """
+        return self.tree(origin).route(destinations)
+    
+    def clear(self):
+        """
+        Drops every cached tree. Must be called after the edges change.
+        """
+        self.trees.clear()
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python ucs_search.py <filename>")
+        return
+
+    filename = sys.argv[1]
+    
+    # Use the common input parser
+    node_pos, edges, origin, destinations = build_data(filename)
+
+    # Create graph instance
+    graph = Graph(node_pos, edges)
+    
+    # Run Uniform-Cost Search
+    goal, count, path = ucs(origin, destinations, edges)
+
+    # Output in required format
+    print(f"{filename} UCS")
+    if path:
+        print(f"{goal} {count}")
+        print(" -> ".join(map(str, path)))
+    else:
+        print("No path found")
+
+if __name__ == "__main__":
+    main()
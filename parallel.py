@@ -0,0 +1,130 @@
+# parallel.py
+# This module spreads batch route queries over several worker processes.
+# The graph is loaded once in the parent. On platforms with fork it is inherited
+# by the workers through copy-on-write memory, so it is never pickled per task;
+# elsewhere it is sent once to each worker when the worker starts.
+# Results are returned in input order, and per-worker throughput is recorded.
+
+import gc
+import os
+import time
+import multiprocessing
+from query_engine import QueryEngine, build_indexes, parse_query
+from methods.search_state import SearchLimitReached
+
+# Set in the parent just before forking, and in each worker by _init_worker.
+_shared_graph = None
+_worker_engine = None
+
+def _init_worker(graph, default_method, hierarchy=None, landmarks=None):
+    """
+    Pool initializer: builds the worker's QueryEngine around the shared graph.
+    graph is None when the pool was forked and the graph is inherited.
+    """
+    global _worker_engine
+    if graph is None:
+        graph = _shared_graph
+    _worker_engine = QueryEngine(graph, default_method, hierarchy=hierarchy, landmarks=landmarks)
+
+def _answer(task):
+    """
+    Answers one (line_number, line) task in a worker.
+
+    :return: A tuple (line_number, result, pid, seconds). result is None for blank or comment lines.
+    """
+    line_number, line = task
+    start = time.perf_counter()
+    try:
+        query = parse_query(line, _worker_engine.default_method)
+        result = _worker_engine.query(*query) if query is not None else None
+    except (ValueError, KeyError, TypeError, SearchLimitReached) as e:
+        result = {"line": line_number, "query": line.strip(), "error": str(e)}
+    return line_number, result, os.getpid(), time.perf_counter() - start
+
+class WorkerStats:
+    """
+    Per-worker query counts and busy time collected while a parallel batch runs.
+    """
+
+    def __init__(self):
+        self.workers = {}  # pid -> [queries answered, seconds spent searching]
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    def record(self, pid, seconds):
+        counts = self.workers.setdefault(pid, [0, 0.0])
+        counts[0] += 1
+        counts[1] += seconds
+
+    @property
+    def total_queries(self):
+        return sum(queries for queries, _ in self.workers.values())
+
+    @property
+    def wall_time(self):
+        end = self.end_time if self.end_time is not None else time.perf_counter()
+        return end - self.start_time
+
+    def report(self):
+        """
+        Returns a human-readable throughput report, one line per worker plus a total.
+        """
+        lines = [f"{'worker':>8} {'queries':>9} {'busy s':>9} {'queries/s':>10}"]
+        for pid, (queries, busy) in sorted(self.workers.items()):
+            rate = queries / busy if busy > 0 else float('inf')
+            lines.append(f"{pid:>8} {queries:>9} {busy:>9.3f} {rate:>10.1f}")
+        wall = self.wall_time
+        rate = self.total_queries / wall if wall > 0 else float('inf')
+        lines.append(f"{'total':>8} {self.total_queries:>9} {wall:>9.3f} {rate:>10.1f}")
+        return "\n".join(lines)
+
+def run_parallel(graph, lines, workers=None, default_method="AS", chunksize=16, stats=None, hierarchy=None,
+                 landmarks=None, prebuild=None):
+    """
+    Answers query lines on a pool of worker processes, yielding results in input order.
+
+    :param graph: The Graph shared (read-only) by every worker.
+    :param lines: An iterable of query lines, in the formats accepted by query_engine.parse_query.
+    :param workers: Number of worker processes (default: the number of CPUs).
+    :param default_method: Method code used for queries that do not name one.
+    :param chunksize: Number of queries handed to a worker at a time.
+    :param stats: Optional WorkerStats instance that receives per-worker timings.
+    :param hierarchy: Optional ContractionHierarchy of the graph, shared by the workers for CH queries.
+    :param landmarks: Optional LandmarkIndex of the graph, shared by the workers for ALT queries.
+    :param prebuild: Method codes whose missing index (CH hierarchy, ALT landmarks) is built here
+                     before the workers start, instead of once in every worker (default: the default method).
+    :return: A generator of result dictionaries, as produced by QueryEngine.answer_lines.
+    """
+    global _shared_graph
+    workers = workers or os.cpu_count() or 1
+
+    # Build the lazily-created indexes before forking so the workers share them too.
+    graph.reverse_edges
+    hierarchy, landmarks = build_indexes(graph, prebuild if prebuild is not None else (default_method,),
+                                         hierarchy, landmarks)
+
+    forked = "fork" in multiprocessing.get_all_start_methods()
+    if forked:
+        context = multiprocessing.get_context("fork")
+        _shared_graph = graph
+        initargs = (None, default_method, hierarchy, landmarks)
+        # Keep the garbage collector from touching (and so copying) the inherited graph.
+        gc.freeze()
+    else:
+        context = multiprocessing.get_context()
+        initargs = (graph, default_method, hierarchy, landmarks)
+
+    try:
+        with context.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            for _, result, pid, seconds in pool.imap(_answer, enumerate(lines, 1), chunksize):
+                if result is None:
+                    continue
+                if stats is not None:
+                    stats.record(pid, seconds)
+                yield result
+    finally:
+        _shared_graph = None
+        if forked:
+            gc.unfreeze()
+        if stats is not None:
+            stats.end_time = time.perf_counter()
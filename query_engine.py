@@ -0,0 +1,284 @@
+# query_engine.py
+# This module answers route queries against a graph that is loaded only once.
+# It holds the method dispatch shared by search.py, and a QueryEngine that reads a
+# stream of origin/destinations queries (plain text or JSON lines) and writes one
+# result per query, so parsing and graph setup are paid once for many queries.
+# Search modules are imported through method_registry when a method first runs.
+
+from contextlib import nullcontext
+from method_registry import BUILTIN_METHODS, load_object, registry
+from methods.search_state import SearchLimitReached
+
+# The built-in method codes; registry.codes() also lists plugin methods.
+METHODS = tuple(BUILTIN_METHODS)
+
+def run_method(method, graph, origin, destinations, hierarchy=None, landmarks=None, stats=None,
+               precompute_heuristic=False):
+    """
+    Runs one search method on a graph.
+
+    :param method: A method code known to method_registry.registry (case-insensitive).
+                   Plugin methods are called as function(origin, destinations, edges, node_positions, stats=stats).
+    :param graph: A Graph instance.
+    :param origin: The starting node ID.
+    :param destinations: A list of destination node IDs.
+    :param hierarchy: Optional ContractionHierarchy of the graph for CH (built if missing).
+    :param landmarks: Optional LandmarkIndex of the graph for ALT (built if missing).
+    :param stats: Optional SearchStats passed to the search; building a missing CH or ALT index
+                  is timed as its "preprocess" phase.
+    :param precompute_heuristic: If True, GBFS, AS, CUS2 and BAS look their Euclidean heuristic up in
+                                 HeuristicTables computed for every node before the search
+                                 (vectorized with NumPy when installed; same values).
+    :return: A tuple (goal_reached, nodes_generated, path) as returned by the method.
+    :raises ValueError: If the method code is unknown.
+    :raises SearchLimitReached: If the search gave up at its node limit (IDA).
+    """
+    method = method.upper()
+    search = registry.resolve(method)
+    if not registry.is_builtin(method):
+        return search(origin, destinations, graph.edges, graph.nodes, stats=stats)
+
+    forward_table = backward_table = None
+    if precompute_heuristic and method in ("GBFS", "AS", "CUS2", "BAS"):
+        HeuristicTable = load_object("methods.heuristic:HeuristicTable")
+        with _phase(stats, "preprocess"):
+            forward_table = HeuristicTable.build(destinations, graph.nodes, stats=stats)
+            if method in ("CUS2", "BAS"):
+                backward_table = HeuristicTable.build([origin], graph.nodes, stats=stats)
+
+    if method in ("BFS", "DFS", "UCS"):
+        return search(origin, destinations, graph.edges, stats)
+    elif method == "GBFS":
+        return search(origin, destinations, graph.edges, graph.nodes, stats, forward_table)
+    elif method == "AS":
+        return search(origin, destinations, graph.edges, graph.nodes, forward_table, stats)
+    elif method == "CUS1":
+        return search(origin, destinations, graph.edges, stats=stats)
+    elif method in ("CUS2", "BAS"):
+        return search(origin, destinations, graph.edges, graph.nodes, graph.reverse_edges,
+                      forward_table, backward_table, stats)
+    elif method == "IDA":
+        return search(origin, destinations, graph.edges, graph.nodes, stats)
+    elif method == "CH":
+        if hierarchy is None:
+            with _phase(stats, "preprocess"):
+                hierarchy = load_object("methods.ch_search:ContractionHierarchy").build(graph.edges, graph.nodes)
+        return search(origin, destinations, graph.edges, hierarchy, stats)
+    elif method == "ALT":
+        if landmarks is None:
+            with _phase(stats, "preprocess"):
+                landmarks = load_object("methods.landmarks:LandmarkIndex").build(
+                    graph.edges, nodes=graph.nodes, reverse_edges=graph.reverse_edges)
+        return search(origin, destinations, graph.edges, graph.nodes,
+                      landmarks.heuristic(destinations, stats=stats), stats)
+    raise ValueError(f"Unknown method '{method}'")
+
+def build_indexes(graph, methods, hierarchy=None, landmarks=None):
+    """
+    Builds the contraction hierarchy and landmark index that a set of methods needs.
+    Called before worker processes start, so they share one copy instead of each
+    building its own on its first CH or ALT query.
+
+    :param graph: A Graph instance.
+    :param methods: Iterable of method codes; CH needs a hierarchy and ALT landmarks, others nothing.
+    :param hierarchy: ContractionHierarchy already loaded (for example from a .ch file), kept as is.
+    :param landmarks: LandmarkIndex already loaded (for example from a .alt file), kept as is.
+    :return: A tuple (hierarchy, landmarks); each is None if no method needs it and none was given.
+    """
+    methods = {method.upper() for method in methods}
+    if hierarchy is None and "CH" in methods and registry.is_builtin("CH"):
+        hierarchy = load_object("methods.ch_search:ContractionHierarchy").build(graph.edges, graph.nodes)
+    if landmarks is None and "ALT" in methods and registry.is_builtin("ALT"):
+        landmarks = load_object("methods.landmarks:LandmarkIndex").build(
+            graph.edges, nodes=graph.nodes, reverse_edges=graph.reverse_edges)
+    return hierarchy, landmarks
+
+def _phase(stats, name):
+    # Times a block as a phase of stats, or does nothing without stats
+    return stats.phase(name) if stats is not None else nullcontext()
+
+def parse_query(line, default_method):
+    """
+    Parses one query line. Two forms are accepted:
+        2 5;4 AS                                              (origin, destinations, optional method)
+        {"origin": 2, "destinations": [5, 4], "method": "AS"}   (JSON, method optional)
+    Anything after a '#' in the plain form is treated as a comment.
+
+    :param line: The raw query line.
+    :param default_method: Method code used when the query does not name one.
+    :return: A tuple (origin, destinations, method), or None for blank and comment lines.
+    :raises ValueError: If the line is malformed.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        import json
+        return query_from_dict(json.loads(line), default_method)
+
+    if '#' in line:
+        line = line.split('#')[0].strip()
+    if not line:
+        return None
+
+    tokens = line.split()
+    method = default_method
+    # A trailing token containing letters is a method code, not a destination.
+    if any(c.isalpha() for c in tokens[-1]):
+        method = tokens.pop()
+    if len(tokens) < 2:
+        raise ValueError("expected '<origin> <dest1>;<dest2>... [method]'")
+
+    origin = int(tokens[0])
+    destinations = [int(item) for item in "".join(tokens[1:]).split(";") if item]
+    return origin, destinations, method.upper()
+
+def query_from_dict(query, default_method):
+    """
+    Reads a query given as a dictionary with "origin", "destinations" (a list or a single ID)
+    and optionally "method" keys, as in the JSON form of parse_query. Other keys are ignored.
+
+    :return: A tuple (origin, destinations, method).
+    :raises KeyError: If origin or destinations is missing.
+    :raises ValueError: If an ID is not an integer.
+    """
+    destinations = query["destinations"]
+    if not isinstance(destinations, list):
+        destinations = [destinations]
+    return int(query["origin"]), [int(d) for d in destinations], query.get("method", default_method).upper()
+
+def format_result(result, output_format="json"):
+    """
+    Formats a result dictionary (see QueryEngine.query) as one output line.
+
+    :param result: The result dictionary.
+    :param output_format: "json" for a JSON object, "text" for "origin method goal count path".
+    :return: The formatted line, without a trailing newline.
+    """
+    if output_format == "json":
+        import json
+        return json.dumps(result)
+    if "error" in result:
+        return f"# Error: {result['error']}"
+    prefix = f"{result['origin']} {result['method']}"
+    if not result["path"]:
+        return f"{prefix} No path found"
+    return f"{prefix} {result['goal']} {result['nodes_generated']} " + " -> ".join(map(str, result["path"]))
+
+class QueryEngine:
+    """
+    Answers many route queries against one loaded Graph.
+    UCS queries are answered from cached shortest-path trees, so repeated queries
+    from the same origin cost a lookup instead of a search. CH queries share one
+    contraction hierarchy, built on the first CH query unless one is given, and
+    ALT queries likewise share one landmark index. With a ResultCache, repeated
+    queries of any method are answered without searching.
+    When the graph is changed in place (its version moves on), the trees, the
+    hierarchy and the landmarks are dropped and rebuilt on demand, and later
+    results are cached under a new process-local key rather than a rehash of the
+    graph (see result_cache.local_graph_key).
+    """
+
+    def __init__(self, graph, default_method="AS", tree_cache_size=128, hierarchy=None, landmarks=None,
+                 result_cache=None):
+        """
+        :param graph: A Graph instance shared by every query.
+        :param default_method: Method code used for queries that do not name one.
+        :param tree_cache_size: Number of UCS shortest-path trees kept (see ShortestPathTreeCache).
+        :param hierarchy: Optional precomputed ContractionHierarchy of the graph.
+        :param landmarks: Optional precomputed LandmarkIndex of the graph.
+        :param result_cache: Optional ResultCache consulted before every search.
+        """
+        self.graph = graph
+        self.default_method = default_method.upper()
+        self.tree_cache = load_object("methods.ucs_search:ShortestPathTreeCache")(graph.edges, tree_cache_size)
+        self.hierarchy = hierarchy
+        self.landmarks = landmarks
+        self.result_cache = result_cache
+        # The content hash is only needed to share entries with a cache file
+        self.graph_hash = None
+        if result_cache is not None:
+            from result_cache import graph_content_hash, local_graph_key
+            self.graph_hash = graph_content_hash(graph) if result_cache.filename is not None else local_graph_key()
+        self.graph_version = graph.version
+
+    def _check_graph_version(self):
+        # Drops everything derived from the graph once it has been changed in place
+        if self.graph.version == self.graph_version:
+            return
+        self.graph_version = self.graph.version
+        self.tree_cache.edges = self.graph.edges
+        self.tree_cache.clear()
+        self.hierarchy = None
+        self.landmarks = None
+        if self.result_cache is not None:
+            from result_cache import local_graph_key
+            self.graph_hash = local_graph_key()
+
+    def query(self, origin, destinations, method=None):
+        """
+        Answers a single query.
+
+        :return: A dictionary with origin, destinations, method, goal, nodes_generated and path.
+        :raises ValueError: If the method code is unknown.
+        """
+        method = (method or self.default_method).upper()
+        self._check_graph_version()
+        if self.result_cache is not None:
+            goal, count, path = self.result_cache.lookup(self.graph_hash, origin, destinations, method,
+                                                         lambda: self._search(origin, destinations, method))
+            path = list(path)
+        else:
+            goal, count, path = self._search(origin, destinations, method)
+        return {
+            "origin": origin,
+            "destinations": destinations,
+            "method": method,
+            "goal": goal,
+            "nodes_generated": count,
+            "path": path,
+        }
+
+    def _search(self, origin, destinations, method):
+        # Runs the search of one query: (goal_reached, nodes_generated, path)
+        if method == "UCS" and registry.is_builtin(method):
+            return self.tree_cache.route(origin, destinations)
+        if method == "CH" and registry.is_builtin(method):
+            if self.hierarchy is None:
+                self.hierarchy = load_object("methods.ch_search:ContractionHierarchy").build(
+                    self.graph.edges, self.graph.nodes)
+            return run_method(method, self.graph, origin, destinations, hierarchy=self.hierarchy)
+        if method == "ALT" and registry.is_builtin(method):
+            if self.landmarks is None:
+                self.landmarks = load_object("methods.landmarks:LandmarkIndex").build(
+                    self.graph.edges, nodes=self.graph.nodes, reverse_edges=self.graph.reverse_edges)
+            return run_method(method, self.graph, origin, destinations, landmarks=self.landmarks)
+        return run_method(method, self.graph, origin, destinations)
+
+    def answer_lines(self, lines):
+        """
+        Answers a stream of query lines, yielding one result dictionary per query.
+        Malformed queries yield a dictionary with an "error" entry instead of stopping the stream.
+
+        :param lines: An iterable of query lines (for example an open file).
+        """
+        for line_number, line in enumerate(lines, 1):
+            try:
+                query = parse_query(line, self.default_method)
+                if query is None:
+                    continue
+                yield self.query(*query)
+            except (ValueError, KeyError, TypeError, SearchLimitReached) as e:
+                yield {"line": line_number, "query": line.strip(), "error": str(e)}
+
+    def answer_stream(self, input_stream, output_stream, output_format="json"):
+        """
+        Reads queries from input_stream and writes one result line per query to output_stream,
+        flushing after each so results can be consumed as they are produced.
+
+        :return: The number of results written.
+        """
+        written = 0
+        for result in self.answer_lines(input_stream):
+            output_stream.write(format_result(result, output_format) + "\n")
+            output_stream.flush()
+            written += 1
+        return written
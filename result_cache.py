@@ -0,0 +1,182 @@
+# result_cache.py
+# This module caches finished route results so repeated queries are answered
+# without searching again. Entries are keyed by a hash of the graph content, the
+# origin, the destinations and the method, so a changed graph never serves stale
+# routes. The cache is bounded (least recently used entries are evicted) and can
+# be saved to and loaded from a JSON file to outlive the process. The file also
+# records the hash of each input file it has seen, by path, size and modification
+# time, so a run on an unchanged file does not hash the graph again.
+
+import os
+import json
+import hashlib
+import itertools
+from collections import OrderedDict
+
+CACHE_FORMAT_VERSION = 1
+
+# Methods whose result depends on the order of the destinations (CUS2 seeds its
+# backward search in that order), so their keys keep the order as given.
+ORDER_SENSITIVE_METHODS = ("CUS2",)
+
+# Numbers the graph states keyed by local_graph_key in this process.
+_local_keys = itertools.count(1)
+
+def graph_content_hash(graph):
+    """
+    Returns a hex digest of the node coordinates and edges of a graph.
+    Nodes are visited in ID order and each adjacency list in its stored order (which
+    decides ties in the searches), so a text file and its compiled copy hash the same.
+
+    :param graph: A Graph instance.
+    :return: The SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    nodes = graph.nodes
+    for node in sorted(nodes):
+        digest.update(repr((node, tuple(nodes[node]))).encode())
+    digest.update(b"|")
+    edges = graph.edges
+    for node in sorted(edges):
+        digest.update(repr((node, [tuple(edge) for edge in edges[node]])).encode())
+    return digest.hexdigest()
+
+def local_graph_key():
+    """
+    Returns a new key for a graph state that only this process needs to recognize, such
+    as a graph just changed in place, without hashing the graph content. Every call
+    returns a different key. Entries under these keys are kept in memory but never saved,
+    since another process could not tell which graph they belong to.
+    """
+    return ("local", next(_local_keys))
+
+def cache_key(graph_hash, origin, destinations, method):
+    """
+    Returns the cache key of a query. Destinations are sorted and deduplicated unless
+    the method depends on their order, so equivalent destination lists share an entry.
+    """
+    method = method.upper()
+    if method in ORDER_SENSITIVE_METHODS:
+        destinations = tuple(destinations)
+    else:
+        destinations = tuple(sorted(set(destinations)))
+    return graph_hash, origin, destinations, method
+
+class ResultCache:
+    """
+    Least-recently-used cache of (goal_reached, nodes_generated, path) results.
+    """
+
+    def __init__(self, maxsize=1024, filename=None):
+        """
+        :param maxsize: Maximum number of results kept.
+        :param filename: Optional JSON file the cache is loaded from (if it exists) and saved to.
+        """
+        self.maxsize = maxsize
+        self.filename = filename
+        self.results = OrderedDict()
+        self.file_hashes = {}  # absolute path -> [mtime_ns, size, graph hash]
+        self.hits = 0
+        self.misses = 0
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+        self.modified = False  # Whether there is anything save would add to the file
+
+    def get(self, key):
+        """
+        Returns the cached result of key, or None on a miss.
+        """
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        """
+        Stores the (goal_reached, nodes_generated, path) result of key.
+        """
+        goal, count, path = result
+        self.results[key] = (goal, count, list(path))
+        self.results.move_to_end(key)
+        self.modified = True
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)  # Evict the least recently used result
+
+    def lookup(self, graph_hash, origin, destinations, method, search):
+        """
+        Returns the cached result of a query, calling search() and caching its result on a miss.
+        """
+        key = cache_key(graph_hash, origin, destinations, method)
+        result = self.get(key)
+        if result is None:
+            result = search()
+            self.put(key, result)
+        return result
+
+    def file_graph_hash(self, filename, graph):
+        """
+        Returns graph_content_hash of the graph read from filename. The hash recorded for
+        the file is reused while its size and modification time are unchanged, so a query
+        on a file seen before costs a stat call instead of hashing the whole graph.
+
+        :param filename: The input file the graph was read from.
+        :param graph: The Graph read from it, hashed when the file is new or has changed.
+        """
+        status = os.stat(filename)
+        path = os.path.abspath(filename)
+        signature = [status.st_mtime_ns, status.st_size]
+        recorded = self.file_hashes.get(path)
+        if recorded is not None and recorded[:2] == signature:
+            return recorded[2]
+        graph_hash = graph_content_hash(graph)
+        self.file_hashes[path] = signature + [graph_hash]
+        self.modified = True
+        return graph_hash
+
+    def clear(self):
+        self.results.clear()
+
+    def load(self, filename):
+        """
+        Adds the entries saved in a cache file (see save), keeping at most maxsize of them.
+
+        :raises ValueError: If the file is not a result cache of this version.
+        """
+        with open(filename, "r") as file:
+            data = json.load(file)
+        if not isinstance(data, dict) or data.get("version") != CACHE_FORMAT_VERSION:
+            raise ValueError(f"{filename} is not a result cache file")
+        for graph_hash, origin, destinations, method, goal, count, path in data["entries"]:
+            self.put((graph_hash, origin, tuple(destinations), method), (goal, count, path))
+        self.file_hashes.update(data.get("files", {}))
+
+    def save(self, filename=None):
+        """
+        Writes the entries, least recently used first, to filename (default: the cache's own file).
+        Entries keyed by local_graph_key are left out. The file is replaced atomically, so a crash
+        never leaves it half written.
+        """
+        filename = filename or self.filename
+        entries = [[graph_hash, origin, list(destinations), method, goal, count, path]
+                   for (graph_hash, origin, destinations, method), (goal, count, path) in self.results.items()
+                   if isinstance(graph_hash, str)]
+        temporary = filename + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"version": CACHE_FORMAT_VERSION, "entries": entries, "files": self.file_hashes}, file)
+        os.replace(temporary, filename)
+        self.modified = False
+
+    def as_dict(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.results), "maxsize": self.maxsize}
+
+    def report(self):
+        """
+        Returns the hit/miss counters as one "# "-prefixed comment line.
+        """
+        lookups = self.hits + self.misses
+        rate = 100.0 * self.hits / lookups if lookups else 0.0
+        return (f"# Result cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate), "
+                f"{len(self.results)}/{self.maxsize} entries")
@@ -1,96 +1,421 @@
+import os
 import sys
-from methods.bfs_search import bfs
-from methods.dfs_search import dfs
-from methods.gbfs_search import gbfs
-from methods.astar_search import astar
-from methods.iddfs_search import iddfs
-from methods.bdwa_search import bdwa
-from input_parser import build_data
+from contextlib import nullcontext
+from query_engine import QueryEngine, format_result, run_method
+from method_registry import registry
+from input_parser import build_data, parse_file
 from graph import Graph
+from methods.search_state import SearchLimitReached
+
+# Modules only some paths need are imported inside them: argparse by the subcommands,
+# json, asyncio, multiprocessing, CH, ALT and routes by the subcommands that use them,
+# graph_format once a file is checked for the binary format, SearchStats (tracemalloc)
+# with --stats and ResultCache (hashlib) with --cache. Search methods are imported
+# through method_registry, so a single search only imports what it runs.
+
+def load_search_graph(filename):
+    """
+    Loads the graph of a text input file or of a compiled binary graph file.
+
+    :return: A tuple (graph, origin, destinations).
+    """
+    from graph_format import is_binary_graph, load_graph
+    if is_binary_graph(filename):
+        compiled = load_graph(filename)
+        return compiled.graph, compiled.origin, compiled.destinations
+    node_pos, edges, origin, destinations = build_data(filename)
+    return Graph(node_pos, edges), origin, destinations
+
+def hierarchy_filename(filename):
+    """
+    Returns the default contraction hierarchy file of a graph file.
+    """
+    return filename + ".ch"
+
+def load_hierarchy(filename):
+    """
+    Loads the contraction hierarchy saved next to a graph file by "search.py contract".
+
+    :return: A ContractionHierarchy, or None if the graph has no hierarchy file.
+    """
+    from methods.ch_search import ContractionHierarchy
+    path = hierarchy_filename(filename)
+    return ContractionHierarchy.load(path) if os.path.exists(path) else None
+
+def routes_main(argv):
+    """
+    Routes mode: lowest-cost routes from the origin to all (or the k nearest) destinations in one search.
+    Usage: python search.py routes <filename> [--k K] [--method UCS|AS|ALT] [--format text|json]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py routes",
+                                     description="Rank the routes to every destination, found in a single search.")
+    parser.add_argument("filename", help="graph input file (text or compiled)")
+    parser.add_argument("--k", type=int, default=None,
+                        help="only return the k nearest destinations (default: all)")
+    parser.add_argument("--method", type=str.upper, choices=["UCS", "AS", "ALT"], default="UCS",
+                        help="UCS (Dijkstra), AS (A* with the Euclidean heuristic) or ALT "
+                             "(A* with landmarks) towards the remaining destinations (default: UCS)")
+    parser.add_argument("--format", choices=["json", "text"], default="text",
+                        help="output format (default: text)")
+    args = parser.parse_args(argv)
+    from methods.landmarks import LandmarkIndex
+    from methods.routes_search import all_routes
+
+    graph, origin, destinations = load_search_graph(args.filename)
+    node_positions = graph.nodes if args.method == "AS" else None
+    heuristic_for = None
+    if args.method == "ALT":
+        landmarks = load_landmarks(args.filename) or LandmarkIndex.build(
+            graph.edges, nodes=graph.nodes, reverse_edges=graph.reverse_edges)
+        heuristic_for = landmarks.heuristic
+    routes, count = all_routes(origin, destinations, graph.edges, node_positions, args.k, heuristic_for)
+
+    if args.format == "json":
+        import json
+        print(json.dumps({
+            "origin": origin,
+            "destinations": destinations,
+            "method": args.method,
+            "nodes_generated": count,
+            "routes": [{"goal": goal, "cost": cost, "path": path} for goal, cost, path in routes],
+        }))
+        return
+
+    # First line as in the standard output, then one "goal cost: path" line per route, nearest first
+    print(f"{args.filename} ROUTES {args.method}")
+    print(f"{len(routes)} {count}")
+    for goal, cost, path in routes:
+        print(f"{goal} {cost}: " + " -> ".join(map(str, path)))
+    reached = {goal for goal, _, _ in routes}
+    if args.k is None:
+        for dest in destinations:
+            if dest not in reached:
+                print(f"{dest} No path found")
+
+def landmarks_filename(filename):
+    """
+    Returns the default landmark index file of a graph file.
+    """
+    return filename + ".alt"
+
+def load_landmarks(filename):
+    """
+    Loads the landmark index saved next to a graph file by "search.py landmarks".
+
+    :return: A LandmarkIndex, or None if the graph has no landmark file.
+    """
+    from methods.landmarks import LandmarkIndex
+    path = landmarks_filename(filename)
+    return LandmarkIndex.load(path) if os.path.exists(path) else None
+
+def landmarks_main(argv):
+    """
+    Landmarks mode: choose ALT landmarks for a graph and save their distance arrays.
+    Usage: python search.py landmarks <filename> [output] [--count K]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py landmarks",
+                                     description="Precompute the landmark distances used by the ALT method.")
+    parser.add_argument("filename", help="graph input file (text or compiled)")
+    parser.add_argument("output", nargs="?",
+                        help="landmark file to write (default: <filename>.alt, which ALT queries pick up)")
+    parser.add_argument("--count", type=int, default=8, help="number of landmarks (default: 8)")
+    args = parser.parse_args(argv)
+    from methods.landmarks import LandmarkIndex
+
+    graph, _, _ = load_search_graph(args.filename)
+    landmarks = LandmarkIndex.build(graph.edges, args.count, graph.nodes, graph.reverse_edges)
+    output = args.output or landmarks_filename(args.filename)
+    landmarks.save(output)
+    print(f"Landmarks {args.filename} -> {output} ({landmarks.num_landmarks} landmarks: "
+          + ", ".join(map(str, landmarks.landmarks)) + ")")
+
+def contract_main(argv):
+    """
+    Contract mode: build the contraction hierarchy of a graph and save it for CH queries.
+    Usage: python search.py contract <filename> [output] [--witness-limit N]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py contract",
+                                     description="Build the contraction hierarchy used by the CH method.")
+    parser.add_argument("filename", help="graph input file (text or compiled)")
+    parser.add_argument("output", nargs="?",
+                        help="hierarchy file to write (default: <filename>.ch, which CH queries pick up)")
+    parser.add_argument("--witness-limit", type=int, default=50,
+                        help="nodes settled by each witness search before a shortcut is added anyway; "
+                             "lower builds faster per search but adds more shortcuts (default: 50)")
+    args = parser.parse_args(argv)
+    from methods.ch_search import ContractionHierarchy
+
+    graph, _, _ = load_search_graph(args.filename)
+    hierarchy = ContractionHierarchy.build(graph.edges, graph.nodes, witness_settle_limit=args.witness_limit)
+    output = args.output or hierarchy_filename(args.filename)
+    hierarchy.save(output)
+    print(f"Contracted {args.filename} -> {output} ({len(hierarchy.rank)} nodes, {hierarchy.num_shortcuts} shortcuts)")
+
+def compile_main(argv):
+    """
+    Compile mode: convert a text input file into the binary graph format.
+    Usage: python search.py compile <filename> <output>
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py compile",
+                                     description="Compile a text input file into a memory-mappable binary graph.")
+    parser.add_argument("filename", help="text input file")
+    parser.add_argument("output", help="binary graph file to write")
+    args = parser.parse_args(argv)
+
+    from graph_format import compile_graph
+    num_nodes, num_edges = compile_graph(args.filename, args.output)
+    print(f"Compiled {args.filename} -> {args.output} ({num_nodes} nodes, {num_edges} edges)")
+
+def add_cache_arguments(parser):
+    """
+    Adds the result cache options shared by the batch and serve subcommands.
+    """
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="answer repeated queries from a cache of the last N results "
+                             "(default: off, or 1024 with --cache-file)")
+    parser.add_argument("--cache-file",
+                        help="JSON file the result cache is loaded from and saved to on exit")
+
+def add_prebuild_argument(parser):
+    """
+    Adds the --prebuild option shared by the batch and serve subcommands.
+    """
+    parser.add_argument("--prebuild", type=lambda value: [code.upper() for code in value.split(",") if code],
+                        metavar="METHODS",
+                        help="comma-separated methods (CH, ALT) whose index is built once before the workers "
+                             "start, when no .ch/.alt file is found (default: the default method)")
+
+def make_result_cache(args):
+    """
+    Returns the ResultCache asked for by the --cache-size and --cache-file options, or None.
+    """
+    if args.cache_size <= 0 and args.cache_file is None:
+        return None
+    from result_cache import ResultCache
+    return ResultCache(args.cache_size if args.cache_size > 0 else 1024, args.cache_file)
+
+def batch_main(argv):
+    """
+    Batch mode: load the graph once and answer a stream of queries.
+    Usage: python search.py batch <filename> [method] [--queries FILE] [--format json|text] [--workers N]
+           [--prebuild METHODS] [--cache-size N] [--cache-file FILE]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py batch",
+                                     description="Answer many route queries against one loaded graph.")
+    parser.add_argument("filename", help="graph input file (its Origin/Destinations are ignored)")
+    parser.add_argument("method", nargs="?", default="AS",
+                        help="default method for queries that do not name one (default: AS)")
+    parser.add_argument("--queries", default="-",
+                        help="query file, one query per line or JSON lines (default: stdin)")
+    parser.add_argument("--format", choices=["json", "text"], default="json",
+                        help="output format, one line per query (default: json)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes; above 1, per-worker throughput "
+                             "is reported on stderr (default: 1)")
+    add_prebuild_argument(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.method not in registry:
+        print(f"Error: Unknown method '{args.method}'")
+        print("Available methods: " + ", ".join(registry.codes()))
+        return
+    result_cache = make_result_cache(args)
+    if result_cache is not None and args.workers > 1:
+        print("Error: The result cache needs --workers 1")
+        return
+
+    graph, _, _ = load_search_graph(args.filename)
+    hierarchy = load_hierarchy(args.filename)
+    landmarks = load_landmarks(args.filename)
+    queries = sys.stdin if args.queries == "-" else open(args.queries, "r")
 
-def get_scenario_description(filename):
-    """Extract scenario description from a file if it exists (lines starting with #)"""
-    scenario = []
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                if line.strip().startswith('#'):
-                    scenario.append(line.strip()[1:].strip())
-                elif line.strip().startswith('Nodes:'):
-                    break
-    except:
-        return ""
-    
-    return "\n".join(scenario) if scenario else ""
+        if args.workers > 1:
+            from parallel import WorkerStats, run_parallel
+            stats = WorkerStats()
+            for result in run_parallel(graph, queries, args.workers, args.method, stats=stats,
+                                       hierarchy=hierarchy, landmarks=landmarks, prebuild=args.prebuild):
+                print(format_result(result, args.format), flush=True)
+            print(stats.report(), file=sys.stderr)
+        else:
+            QueryEngine(graph, args.method, hierarchy=hierarchy, landmarks=landmarks,
+                        result_cache=result_cache).answer_stream(queries, sys.stdout, args.format)
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if result_cache is not None:
+            if result_cache.filename is not None:
+                result_cache.save()
+            print(result_cache.report(), file=sys.stderr)
 
-def extract_node_names(filename):
-    """Extract node names from comments in the node definitions"""
-    node_names = {}
+def serve_main(argv):
+    """
+    Server mode: keep graphs loaded and answer queries over a Unix socket or HTTP on localhost.
+    Usage: python search.py serve <filename> [<filename> ...] [--method M] [--socket PATH] [--port N]
+           [--workers N] [--format json|text] [--prebuild METHODS] [--cache-size N] [--cache-file FILE]
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog="search.py serve",
+                                     description="Answer route queries from a resident process.")
+    parser.add_argument("filenames", nargs="+", metavar="filename",
+                        help="graph files to load; queries pick one by its base name (default: the first)")
+    parser.add_argument("--method", default="AS",
+                        help="default method for queries that do not name one (default: AS)")
+    parser.add_argument("--socket", help="Unix socket to serve one-query-per-line requests on")
+    parser.add_argument("--port", type=int,
+                        help="port to serve HTTP on, on 127.0.0.1 (default: 8765 when no socket is given)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: the number of CPUs)")
+    parser.add_argument("--format", choices=["json", "text"], default="json",
+                        help="result format on the Unix socket (default: json)")
+    add_prebuild_argument(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.method not in registry:
+        print(f"Error: Unknown method '{args.method}'")
+        print("Available methods: " + ", ".join(registry.codes()))
+        return
+    port = args.port if args.port is not None or args.socket is not None else 8765
+
+    graphs = {}
+    for filename in args.filenames:
+        name = os.path.basename(filename)
+        if name in graphs:
+            print(f"Error: Two graphs are named '{name}'")
+            return
+        graph, _, _ = load_search_graph(filename)
+        graphs[name] = (graph, load_hierarchy(filename), load_landmarks(filename))
+
+    import asyncio
+    from server import RouteServer
+    server = RouteServer(graphs, args.method, args.workers, args.format, make_result_cache(args), args.prebuild)
     try:
-        in_nodes_section = False
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('Nodes:'):
-                    in_nodes_section = True
-                    continue
-                elif line.startswith('Edges:'):
-                    in_nodes_section = False
-                    break
-                
-                if in_nodes_section and ':' in line and '#' in line:
-                    # Extract node ID and name from lines like "1: (0,0)    # Downtown Central Station"
-                    parts = line.split(':', 1)
-                    node_id = parts[0].strip()
-                    comment_parts = parts[1].split('#', 1)
-                    if len(comment_parts) > 1:
-                        node_name = comment_parts[1].strip()
-                        node_names[int(node_id)] = node_name
-    except Exception as e:
-        print(f"# Note: Couldn't extract node names: {str(e)}")
-    
-    return node_names
+        asyncio.run(server.serve(args.socket, port))
+    except KeyboardInterrupt:
+        pass
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python search.py <filename> <method>")
-        print("Available methods: BFS, DFS, GBFS, AS, CUS1, CUS2")
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        serve_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        batch_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "compile":
+        compile_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "contract":
+        contract_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "landmarks":
+        landmarks_main(sys.argv[2:])
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == "routes":
+        routes_main(sys.argv[2:])
         return
 
-    filename = sys.argv[1]
-    method = sys.argv[2].upper()
+    # Flags: --stats (or --stats=text), --stats=json, --trace-memory with either,
+    # --precompute-heuristic to compute the Euclidean heuristic of every node before searching,
+    # and --cache=FILE to answer repeated queries from a result cache saved in FILE
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    flags = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    stats_formats = {"--stats": "text", "--stats=text": "text", "--stats=json": "json"}
+    unknown_flags = [flag for flag in flags
+                     if flag not in stats_formats and flag not in ("--trace-memory", "--precompute-heuristic")
+                     and not flag.startswith("--cache=")]
 
-    # Read the problem using the dedicated input parser
-    node_pos, edges, origin, destinations = build_data(filename)
+    if len(args) != 2 or unknown_flags:
+        print("Usage: python search.py <filename> <method> [--stats[=text|json]] [--trace-memory] "
+              "[--precompute-heuristic] [--cache=FILE]")
+        print("       python search.py batch <filename> [method] [--queries FILE] [--format json|text] [--workers N] "
+              "[--prebuild METHODS] [--cache-size N] [--cache-file FILE]")
+        print("       python search.py serve <filename> [<filename> ...] [--method M] [--socket PATH] [--port N] "
+              "[--workers N] [--prebuild METHODS] [--cache-size N] [--cache-file FILE]")
+        print("       python search.py compile <filename> <output>")
+        print("       python search.py contract <filename> [output] [--witness-limit N]")
+        print("       python search.py landmarks <filename> [output] [--count K]")
+        print("       python search.py routes <filename> [--k K] [--method UCS|AS|ALT] [--format text|json]")
+        print("Available methods: " + ", ".join(registry.codes()))
+        return
+
+    filename = args[0]
+    method = args[1].upper()
+
+    stats_format = next((stats_formats[flag] for flag in flags if flag in stats_formats), None)
+    stats = None
+    if stats_format:
+        from methods.search_stats import SearchStats
+        stats = SearchStats(track_memory="--trace-memory" in flags)
+    cache_file = next((flag[len("--cache="):] for flag in flags if flag.startswith("--cache=")), None)
+
+    def phase(name):
+        return stats.phase(name) if stats is not None else nullcontext()
 
-    # Create graph instance
-    graph = Graph(node_pos, edges)
+    with phase("parse"):
+        # Compiled binary graphs are memory-mapped and carry their own names and scenario
+        from graph_format import is_binary_graph, load_graph
+        compiled = load_graph(filename) if is_binary_graph(filename) else None
+
+        if compiled is not None:
+            graph, origin, destinations = compiled.graph, compiled.origin, compiled.destinations
+            scenario, node_names = compiled.scenario, compiled.node_names
+        else:
+            # Read the problem, its scenario description and the node names in one pass
+            parsed = parse_file(filename)
+            origin, destinations = parsed.origin, parsed.destinations
+            scenario, node_names = parsed.scenario, parsed.node_names
+
+            # Create graph instance
+            graph = Graph(parsed.nodes, parsed.edges)
     
-    # Get scenario description if it exists
-    scenario = get_scenario_description(filename)
+    # Print the scenario description if it exists
     if scenario:
         print(f"# {scenario}")
         print("#")
     
-    # Extract node names for human-readable output
-    node_names = extract_node_names(filename)
-    
     # Select and run the appropriate search method
-    if method == "BFS":
-        goal, count, path = bfs(origin, destinations, edges)
-    elif method == "DFS":
-        goal, count, path = dfs(origin, destinations, edges)
-    elif method == "GBFS":
-        goal, count, path = gbfs(origin, destinations, edges, node_pos)
-    elif method == "AS":
-        goal, count, path = astar(origin, destinations, edges, node_pos)
-    elif method == "CUS1":
-        goal, count, path = iddfs(origin, destinations, edges)
-    elif method == "CUS2":
-        goal, count, path = bdwa(origin, destinations, edges, node_pos)
-    else:
+    if method not in registry:
         print(f"Error: Unknown method '{method}'")
-        print("Available methods: BFS, DFS, GBFS, AS, CUS1, CUS2")
+        print("Available methods: " + ", ".join(registry.codes()))
+        return
+
+    def search():
+        # CH and ALT use the preprocessing saved by "search.py contract" / "search.py landmarks" if there is one
+        with phase("preprocess"):
+            hierarchy = load_hierarchy(filename) if method == "CH" else None
+            landmarks = load_landmarks(filename) if method == "ALT" else None
+            if method == "CH" and hierarchy is None and registry.is_builtin("CH"):
+                # run_method contracts the whole graph for this one query, which costs far more than the search
+                print(f"Warning: no contraction hierarchy for {filename}; contracting it for this query only. "
+                      f"Run \"python search.py contract {filename}\" once to save it.", file=sys.stderr)
+        with phase("search"):
+            return run_method(method, graph, origin, destinations, hierarchy, landmarks, stats,
+                              "--precompute-heuristic" in flags)
+
+    try:
+        if cache_file is not None:
+            from result_cache import ResultCache
+            cache = ResultCache(filename=cache_file)
+            with phase("preprocess"):
+                # Hashed only when the file is new to the cache or has changed since
+                graph_hash = cache.file_graph_hash(filename, graph)
+            goal, count, path = cache.lookup(graph_hash, origin, destinations, method, search)
+            if cache.modified:
+                cache.save()
+        else:
+            cache = None
+            goal, count, path = search()
+    except SearchLimitReached as e:
+        # Not "No path found": the search stopped before it could tell
+        print(f"{filename} {method}")
+        print(f"Gave up: {e}")
         return
 
     # Output in required format (must follow assignment requirements)
@@ -121,5 +446,13 @@ def main():
     else:
         print("No path found")
 
+    if stats_format == "json":
+        print(stats.to_json())
+    elif stats_format == "text":
+        print("#")
+        print(stats.report())
+    if cache is not None:
+        print(cache.report())
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
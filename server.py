@@ -0,0 +1,282 @@
+# server.py
+# This module keeps one or more graphs loaded in a long-running process and answers
+# route queries over a local Unix socket or HTTP on localhost, so a query costs a
+# search instead of interpreter startup, imports and a full parse of the input file.
+# Connections are handled by asyncio; the searches run on a pool of worker processes.
+# As in parallel.py, the graphs are inherited by the workers through fork where
+# available and sent once to each worker when it starts elsewhere.
+
+import gc
+import os
+import sys
+import json
+import asyncio
+import multiprocessing
+from urllib.parse import parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from query_engine import QueryEngine, build_indexes, parse_query, query_from_dict, format_result
+from result_cache import cache_key, graph_content_hash, local_graph_key
+from methods.search_state import SearchLimitReached
+
+# Set in the parent before the pool forks, and in each worker by _init_worker.
+_shared_graphs = None
+_worker_engines = None
+
+def _init_worker(graphs, default_method):
+    """
+    Pool initializer: builds one QueryEngine per served graph.
+    graphs is None when the pool was forked and the graphs are inherited.
+    """
+    global _worker_engines
+    if graphs is None:
+        graphs = _shared_graphs
+    _worker_engines = {name: QueryEngine(graph, default_method, hierarchy=hierarchy, landmarks=landmarks)
+                       for name, (graph, hierarchy, landmarks) in graphs.items()}
+
+def _answer(graph_name, origin, destinations, method):
+    # Runs in a worker process
+    result = _worker_engines[graph_name].query(origin, destinations, method)
+    result["graph"] = graph_name
+    return result
+
+def _ready():
+    # Submitted once at startup so the workers exist before the first query arrives
+    return os.getpid()
+
+class RouteServer:
+    """
+    Answers route queries against graphs loaded once at startup.
+
+    Two transports are offered, both of which may be served at the same time:
+    - A Unix socket speaking the batch query protocol: one query per line, in either
+      form accepted by query_engine.parse_query (JSON queries may add a "graph" key),
+      and one result line per query, in order
+    - HTTP on localhost: GET /route?origin=2&destinations=5;4&method=AS&graph=NAME,
+      POST /route with a JSON query as the body, GET /graphs and GET /stats; responses are JSON
+    Queries that do not name a graph are answered on the first one. With a ResultCache,
+    repeated queries are answered in the server process without reaching a worker.
+    """
+
+    def __init__(self, graphs, default_method="AS", workers=None, output_format="json", result_cache=None,
+                 prebuild=None):
+        """
+        :param graphs: Dictionary mapping graph names to (graph, hierarchy, landmarks) tuples;
+                       hierarchy and landmarks may be None (they are then built on first use,
+                       or before the workers start for the methods in prebuild).
+        :param default_method: Method code used for queries that do not name one.
+        :param workers: Number of worker processes (default: the number of CPUs).
+        :param output_format: "json" or "text", the result format of the socket protocol.
+        :param result_cache: Optional ResultCache shared by every graph; saved on close if it has a file.
+        :param prebuild: Method codes whose missing CH hierarchy or ALT landmarks are built in the server
+                         process before the workers start (default: the default method).
+        :raises ValueError: If no graph is given.
+        """
+        if not graphs:
+            raise ValueError("at least one graph is required")
+        self.graphs = graphs
+        self.default_graph = next(iter(graphs))
+        self.default_method = default_method.upper()
+        self.workers = workers or os.cpu_count() or 1
+        self.output_format = output_format
+        self.result_cache = result_cache
+        self.prebuild = (self.default_method,) if prebuild is None else tuple(prebuild)
+        self.graph_hashes = {}
+        self.pool = None
+        self.forked = False
+
+    def start(self):
+        """
+        Starts the worker pool and waits until every worker is up.
+        """
+        global _shared_graphs
+        if self.pool is not None:
+            return
+
+        # Build the lazily-created indexes before forking so the workers share them too.
+        for name, (graph, hierarchy, landmarks) in self.graphs.items():
+            graph.reverse_edges
+            self.graphs[name] = (graph, *build_indexes(graph, self.prebuild, hierarchy, landmarks))
+        if self.result_cache is not None:
+            # Content hashes are only needed to share entries with the cache file
+            key_of = graph_content_hash if self.result_cache.filename is not None else (lambda graph: local_graph_key())
+            self.graph_hashes = {name: key_of(graph) for name, (graph, _, _) in self.graphs.items()}
+
+        self.forked = "fork" in multiprocessing.get_all_start_methods()
+        if self.forked:
+            context = multiprocessing.get_context("fork")
+            _shared_graphs = self.graphs
+            initargs = (None, self.default_method)
+            # Keep the garbage collector from touching (and so copying) the inherited graphs.
+            gc.freeze()
+        else:
+            context = multiprocessing.get_context()
+            initargs = (self.graphs, self.default_method)
+
+        self.pool = ProcessPoolExecutor(self.workers, context, _init_worker, initargs)
+        for future in [self.pool.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def close(self):
+        """
+        Shuts the worker pool down and saves the result cache to its file, if it has one.
+        """
+        global _shared_graphs
+        if self.pool is None:
+            return
+        if self.result_cache is not None and self.result_cache.filename is not None:
+            self.result_cache.save()
+        self.pool.shutdown(cancel_futures=True)
+        self.pool = None
+        _shared_graphs = None
+        if self.forked:
+            gc.unfreeze()
+
+    async def route(self, query):
+        """
+        Answers one query on a worker.
+
+        :param query: A query line (see query_engine.parse_query) or a query dictionary
+                      (see query_engine.query_from_dict) with an optional "graph" key.
+        :return: A result dictionary as produced by QueryEngine.query, with the graph name added,
+                 or None for blank and comment lines.
+        :raises ValueError: If the query is malformed or names an unknown graph or method.
+        """
+        graph_name = self.default_graph
+        if isinstance(query, str):
+            if query.strip().startswith("{"):
+                query = json.loads(query)
+            else:
+                parsed = parse_query(query, self.default_method)
+                if parsed is None:
+                    return None
+        if isinstance(query, dict):
+            graph_name = query.get("graph", graph_name)
+            parsed = query_from_dict(query, self.default_method)
+        if graph_name not in self.graphs:
+            raise ValueError(f"Unknown graph '{graph_name}'")
+
+        key = None
+        if self.result_cache is not None:
+            key = cache_key(self.graph_hashes[graph_name], *parsed)
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                origin, destinations, method = parsed
+                goal, count, path = cached
+                return {"origin": origin, "destinations": destinations, "method": method, "goal": goal,
+                        "nodes_generated": count, "path": list(path), "graph": graph_name}
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self.pool, _answer, graph_name, *parsed)
+        if key is not None:
+            self.result_cache.put(key, (result["goal"], result["nodes_generated"], result["path"]))
+        return result
+
+    async def handle_lines(self, reader, writer):
+        """
+        Serves one socket connection: one result line per query line, until the client closes.
+        """
+        line_number = 0
+        try:
+            while line := await reader.readline():
+                line_number += 1
+                line = line.decode("utf-8", "replace")
+                try:
+                    result = await self.route(line)
+                except (ValueError, KeyError, TypeError, SearchLimitReached) as e:
+                    result = {"line": line_number, "query": line.strip(), "error": str(e)}
+                if result is None:
+                    continue
+                writer.write((format_result(result, self.output_format) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_http(self, reader, writer):
+        """
+        Serves one HTTP connection, keeping it open between requests unless asked not to.
+        """
+        try:
+            while request_line := await reader.readline():
+                if not request_line.strip():
+                    continue
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (header := await reader.readline()).strip():
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._http_response(method, target, body)
+                data = json.dumps(payload).encode()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status}\r\n"
+                             "Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Client went away, or sent something that is not HTTP
+            pass
+        finally:
+            writer.close()
+
+    async def _http_response(self, method, target, body):
+        # Returns (status line, JSON payload) for one request
+        path, _, query_string = target.partition("?")
+        if path == "/graphs" and method == "GET":
+            return "200 OK", {"graphs": list(self.graphs), "default": self.default_graph}
+        if path == "/stats" and method == "GET":
+            cache = self.result_cache.as_dict() if self.result_cache is not None else None
+            return "200 OK", {"workers": self.workers, "result_cache": cache}
+        if path != "/route":
+            return "404 Not Found", {"error": f"Unknown path '{path}'"}
+        try:
+            if method == "GET":
+                query = {name: values[-1] for name, values in parse_qs(query_string).items()}
+                if "destinations" in query:
+                    query["destinations"] = [item for item in query["destinations"].replace(",", ";").split(";")
+                                             if item]
+            elif method == "POST":
+                query = json.loads(body)
+                if not isinstance(query, dict):
+                    raise ValueError("expected a JSON object")
+            else:
+                return "405 Method Not Allowed", {"error": f"Method '{method}' is not allowed"}
+            return "200 OK", await self.route(query)
+        except (ValueError, KeyError, TypeError) as e:
+            return "400 Bad Request", {"error": str(e)}
+        except SearchLimitReached as e:
+            return "422 Unprocessable Entity", {"error": str(e)}
+
+    async def serve(self, socket_path=None, port=None):
+        """
+        Starts the worker pool and serves until cancelled.
+
+        :param socket_path: Path of a Unix socket to serve the line protocol on (replaced if it exists).
+        :param port: Port to serve HTTP on, bound to 127.0.0.1 only.
+        :raises ValueError: If neither a socket path nor a port is given.
+        """
+        if socket_path is None and port is None:
+            raise ValueError("a socket path or a port is required")
+        self.start()
+        servers = []
+        try:
+            if socket_path is not None:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+                servers.append(await asyncio.start_unix_server(self.handle_lines, socket_path))
+                print(f"Serving {', '.join(self.graphs)} on unix:{socket_path}", file=sys.stderr)
+            if port is not None:
+                servers.append(await asyncio.start_server(self.handle_http, "127.0.0.1", port))
+                print(f"Serving {', '.join(self.graphs)} on http://127.0.0.1:{port}", file=sys.stderr)
+            await asyncio.gather(*(server.serve_forever() for server in servers))
+        finally:
+            for server in servers:
+                server.close()
+            if socket_path is not None and os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.close()